@@ -33,7 +33,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     coordinator = HTTPAgentCoordinator(hass, data)
 
     # Fetch initial data
-    await coordinator.async_config_entry_first_refresh()
+    try:
+        await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        # Release the shared connector before setup is retried
+        await coordinator.async_close()
+        raise
 
     # Determine which platforms are needed based on sensor types
     data = dict(entry.data)
@@ -11,23 +11,36 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+import homeassistant.helpers.config_validation as cv
 
 from .const import (
     BINARY_SENSOR_DEVICE_CLASSES,
+    CONF_ACCEPT_ENCODING,
+    CONF_COALESCE_WINDOW,
     CONF_CONTENT_TYPE,
+    CONF_EARLY_STOP,
+    CONF_EXTRACTION_BACKEND,
     CONF_HEADERS,
+    CONF_HTML_STRAINER,
     CONF_INTERVAL,
+    CONF_MAX_BODY_SIZE,
     CONF_METHOD,
     CONF_PAYLOAD,
+    CONF_REFRESH_ON_CHANGE,
     CONF_RETRIES,
+    CONF_SENSOR_ATTRIBUTES,
     CONF_SENSOR_COLOR,
     CONF_SENSOR_DEVICE_CLASS,
     CONF_SENSOR_ICON,
+    CONF_SENSOR_ITEM_KEY,
+    CONF_SENSOR_ITEMS,
+    CONF_SENSOR_METHOD,
     CONF_SENSOR_NAME,
     CONF_SENSOR_STATE,
     CONF_SENSOR_TYPE,
     CONF_SENSOR_UNIT,
     CONF_SENSORS,
+    CONF_STREAMING_JSON,
     CONF_TIMEOUT,
     CONF_TRACKER_LATITUDE,
     CONF_TRACKER_LOCATION_NAME,
@@ -35,13 +48,26 @@ from .const import (
     CONF_TRACKER_SOURCE_TYPE,
     CONF_URL,
     CONF_VERIFY_SSL,
+    CONTENT_ENCODINGS,
     CONTENT_TYPES,
+    DEFAULT_ACCEPT_ENCODING,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_EARLY_STOP,
+    DEFAULT_EXTRACTION_BACKEND,
+    DEFAULT_HTML_STRAINER,
     DEFAULT_INTERVAL,
+    DEFAULT_MAX_BODY_SIZE,
     DEFAULT_METHOD,
+    DEFAULT_REFRESH_ON_CHANGE,
     DEFAULT_RETRIES,
+    DEFAULT_SENSOR_METHOD,
+    DEFAULT_STREAMING_JSON,
     DEFAULT_TIMEOUT,
     DEFAULT_VERIFY_SSL,
     DOMAIN,
+    EXTRACTION_BACKENDS,
+    EXTRACTION_METHODS,
+    FAN_OUT_SENSOR_TYPES,
     HTTP_METHODS,
     HTTP_METHODS_WITH_PAYLOAD,
     NUMBER_DEVICE_CLASSES,
@@ -298,6 +324,9 @@ class HTTPAgentConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 CONF_TRACKER_LONGITUDE,
                 CONF_TRACKER_LOCATION_NAME,
                 CONF_TRACKER_SOURCE_TYPE,
+                CONF_SENSOR_ITEMS,
+                CONF_SENSOR_ITEM_KEY,
+                CONF_SENSOR_ATTRIBUTES,
             ]
             for field in optional_fields:
                 if field not in sensor_config:
@@ -314,6 +343,9 @@ class HTTPAgentConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         # Base schema with common fields
         schema_dict = {
             vol.Required(CONF_SENSOR_STATE): str,
+            vol.Optional(CONF_SENSOR_METHOD, default=DEFAULT_SENSOR_METHOD): vol.In(
+                EXTRACTION_METHODS
+            ),
             vol.Optional(CONF_SENSOR_ICON, default=""): str,
             vol.Optional(CONF_SENSOR_COLOR, default=""): str,
         }
@@ -342,6 +374,13 @@ class HTTPAgentConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 ["none", "gps", "router", "bluetooth", "bluetooth_le"]
             )
 
+        schema_dict[vol.Optional(CONF_SENSOR_ATTRIBUTES, default="")] = str
+
+        # Fan-out: one entity per element of a JSON array
+        if sensor_type in FAN_OUT_SENSOR_TYPES:
+            schema_dict[vol.Optional(CONF_SENSOR_ITEMS, default="")] = str
+            schema_dict[vol.Optional(CONF_SENSOR_ITEM_KEY, default="")] = str
+
         schema = vol.Schema(schema_dict)
 
         return self.async_show_form(
@@ -387,9 +426,11 @@ class HTTPAgentOptionsFlow(config_entries.OptionsFlow):
                 return await self.async_step_payload()
             elif action == "sensors":
                 return await self.async_step_sensors()
+            elif action == "advanced":
+                return await self.async_step_advanced()
 
         # Build options menu based on current method
-        options = ["basic", "headers", "sensors"]
+        options = ["basic", "headers", "sensors", "advanced"]
 
         # Add payload option only for methods that support it
         if self.data.get(CONF_METHOD, DEFAULT_METHOD) in HTTP_METHODS_WITH_PAYLOAD:
@@ -456,6 +497,64 @@ class HTTPAgentOptionsFlow(config_entries.OptionsFlow):
             errors=errors,
         )
 
+    async def async_step_advanced(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Edit advanced parsing and performance settings."""
+        if user_input is not None:
+            self.data.update(user_input)
+            return self.async_create_entry(title="", data=self.data)
+
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_EXTRACTION_BACKEND,
+                    default=self.data.get(
+                        CONF_EXTRACTION_BACKEND, DEFAULT_EXTRACTION_BACKEND
+                    ),
+                ): vol.In(EXTRACTION_BACKENDS),
+                vol.Optional(
+                    CONF_STREAMING_JSON,
+                    default=self.data.get(CONF_STREAMING_JSON, DEFAULT_STREAMING_JSON),
+                ): bool,
+                vol.Optional(
+                    CONF_HTML_STRAINER,
+                    default=self.data.get(CONF_HTML_STRAINER, DEFAULT_HTML_STRAINER),
+                ): bool,
+                vol.Optional(
+                    CONF_ACCEPT_ENCODING,
+                    default=self.data.get(
+                        CONF_ACCEPT_ENCODING, DEFAULT_ACCEPT_ENCODING
+                    ),
+                ): cv.multi_select(CONTENT_ENCODINGS),
+                vol.Optional(
+                    CONF_MAX_BODY_SIZE,
+                    default=self.data.get(CONF_MAX_BODY_SIZE, DEFAULT_MAX_BODY_SIZE),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_EARLY_STOP,
+                    default=self.data.get(CONF_EARLY_STOP, DEFAULT_EARLY_STOP),
+                ): bool,
+                vol.Optional(
+                    CONF_REFRESH_ON_CHANGE,
+                    default=self.data.get(
+                        CONF_REFRESH_ON_CHANGE, DEFAULT_REFRESH_ON_CHANGE
+                    ),
+                ): bool,
+                vol.Optional(
+                    CONF_COALESCE_WINDOW,
+                    default=self.data.get(
+                        CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+            }
+        )
+
+        return self.async_show_form(
+            step_id="advanced",
+            data_schema=schema,
+        )
+
     async def async_step_headers(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -669,6 +768,9 @@ class HTTPAgentOptionsFlow(config_entries.OptionsFlow):
                     CONF_SENSOR_TYPE, "sensor"
                 ),
                 CONF_SENSOR_STATE: user_input.get(CONF_SENSOR_STATE, ""),
+                CONF_SENSOR_METHOD: user_input.get(
+                    CONF_SENSOR_METHOD, DEFAULT_SENSOR_METHOD
+                ),
                 CONF_SENSOR_ICON: user_input.get(CONF_SENSOR_ICON, ""),
                 CONF_SENSOR_COLOR: user_input.get(CONF_SENSOR_COLOR, ""),
             }
@@ -702,6 +804,18 @@ class HTTPAgentOptionsFlow(config_entries.OptionsFlow):
                         CONF_TRACKER_SOURCE_TYPE
                     ]
 
+            sensor_config[CONF_SENSOR_ATTRIBUTES] = (
+                user_input.get(CONF_SENSOR_ATTRIBUTES) or ""
+            )
+
+            if sensor_type in FAN_OUT_SENSOR_TYPES:
+                sensor_config[CONF_SENSOR_ITEMS] = (
+                    user_input.get(CONF_SENSOR_ITEMS) or ""
+                )
+                sensor_config[CONF_SENSOR_ITEM_KEY] = (
+                    user_input.get(CONF_SENSOR_ITEM_KEY) or ""
+                )
+
             self.sensors[self.selected_sensor_index] = sensor_config
             return await self.async_step_sensors()
 
@@ -715,6 +829,10 @@ class HTTPAgentOptionsFlow(config_entries.OptionsFlow):
             vol.Optional(
                 CONF_SENSOR_STATE, default=sensor.get(CONF_SENSOR_STATE, "")
             ): str,
+            vol.Optional(
+                CONF_SENSOR_METHOD,
+                default=sensor.get(CONF_SENSOR_METHOD, DEFAULT_SENSOR_METHOD),
+            ): vol.In(EXTRACTION_METHODS),
             vol.Optional(
                 CONF_SENSOR_ICON, default=sensor.get(CONF_SENSOR_ICON, "")
             ): str,
@@ -776,10 +894,24 @@ class HTTPAgentOptionsFlow(config_entries.OptionsFlow):
                 )
             ] = vol.In(["none", "gps", "router", "bluetooth", "bluetooth_le"])
 
+        schema_dict[vol.Optional(CONF_SENSOR_ATTRIBUTES)] = str
+
+        if sensor_type in FAN_OUT_SENSOR_TYPES:
+            schema_dict[vol.Optional(CONF_SENSOR_ITEMS)] = str
+            schema_dict[vol.Optional(CONF_SENSOR_ITEM_KEY)] = str
+
         schema = vol.Schema(schema_dict)
         suggested_values: dict[str, Any] = {}
         if sensor_type in ("sensor", "number"):
             suggested_values[CONF_SENSOR_UNIT] = sensor.get(CONF_SENSOR_UNIT) or ""
+        suggested_values[CONF_SENSOR_ATTRIBUTES] = (
+            sensor.get(CONF_SENSOR_ATTRIBUTES) or ""
+        )
+        if sensor_type in FAN_OUT_SENSOR_TYPES:
+            suggested_values[CONF_SENSOR_ITEMS] = sensor.get(CONF_SENSOR_ITEMS) or ""
+            suggested_values[CONF_SENSOR_ITEM_KEY] = (
+                sensor.get(CONF_SENSOR_ITEM_KEY) or ""
+            )
 
         return self.async_show_form(
             step_id="modify_sensor",
@@ -834,6 +966,9 @@ class HTTPAgentOptionsFlow(config_entries.OptionsFlow):
                 CONF_TRACKER_LONGITUDE,
                 CONF_TRACKER_LOCATION_NAME,
                 CONF_TRACKER_SOURCE_TYPE,
+                CONF_SENSOR_ITEMS,
+                CONF_SENSOR_ITEM_KEY,
+                CONF_SENSOR_ATTRIBUTES,
             ]
             for field in optional_fields:
                 if field not in sensor_config:
@@ -850,6 +985,9 @@ class HTTPAgentOptionsFlow(config_entries.OptionsFlow):
         # Base schema with common fields
         schema_dict = {
             vol.Required(CONF_SENSOR_STATE): str,
+            vol.Optional(CONF_SENSOR_METHOD, default=DEFAULT_SENSOR_METHOD): vol.In(
+                EXTRACTION_METHODS
+            ),
             vol.Optional(CONF_SENSOR_ICON, default=""): str,
             vol.Optional(CONF_SENSOR_COLOR, default=""): str,
         }
@@ -878,6 +1016,13 @@ class HTTPAgentOptionsFlow(config_entries.OptionsFlow):
                 ["none", "gps", "router", "bluetooth", "bluetooth_le"]
             )
 
+        schema_dict[vol.Optional(CONF_SENSOR_ATTRIBUTES, default="")] = str
+
+        # Fan-out: one entity per element of a JSON array
+        if sensor_type in FAN_OUT_SENSOR_TYPES:
+            schema_dict[vol.Optional(CONF_SENSOR_ITEMS, default="")] = str
+            schema_dict[vol.Optional(CONF_SENSOR_ITEM_KEY, default="")] = str
+
         schema = vol.Schema(schema_dict)
 
         return self.async_show_form(
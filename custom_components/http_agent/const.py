@@ -10,6 +10,15 @@ DEFAULT_RETRIES = 0
 DEFAULT_INTERVAL = 60
 DEFAULT_METHOD = "GET"
 DEFAULT_VERIFY_SSL = True
+DEFAULT_EXTRACTION_BACKEND = "auto"
+DEFAULT_STREAMING_JSON = False
+DEFAULT_HTML_STRAINER = False
+DEFAULT_SENSOR_METHOD = "auto"
+DEFAULT_ACCEPT_ENCODING = ["gzip", "deflate", "br", "zstd"]
+DEFAULT_MAX_BODY_SIZE = 0
+DEFAULT_EARLY_STOP = False
+DEFAULT_REFRESH_ON_CHANGE = False
+DEFAULT_COALESCE_WINDOW = 0
 
 # Configuration keys
 CONF_URL = "url"
@@ -26,12 +35,27 @@ CONF_SENSOR_NAME = "sensor_name"
 CONF_SENSOR_STATE = "sensor_state"
 CONF_SENSOR_ICON = "sensor_icon"
 CONF_SENSOR_COLOR = "sensor_color"
+CONF_SENSOR_METHOD = "sensor_method"
+CONF_SENSOR_ITEMS = "sensor_items"
+CONF_SENSOR_ITEM_KEY = "sensor_item_key"
+CONF_SENSOR_ATTRIBUTES = "sensor_attributes"
+CONF_EXTRACTION_BACKEND = "extraction_backend"
+CONF_STREAMING_JSON = "streaming_json"
+CONF_HTML_STRAINER = "html_strainer"
+CONF_ACCEPT_ENCODING = "accept_encoding"
+CONF_MAX_BODY_SIZE = "max_body_size"
+CONF_EARLY_STOP = "early_stop"
+CONF_REFRESH_ON_CHANGE = "refresh_on_change"
+CONF_COALESCE_WINDOW = "coalesce_window"
 
 # Sensor type configuration
 CONF_SENSOR_TYPE = "sensor_type"
 CONF_SENSOR_DEVICE_CLASS = "sensor_device_class"
 CONF_SENSOR_UNIT = "sensor_unit"
 
+# Sensor types that can fan out an array into one entity per element
+FAN_OUT_SENSOR_TYPES = {"sensor", "device_tracker"}
+
 # Sensor Types
 SENSOR_TYPES = {
     "sensor": "Sensor",
@@ -208,3 +232,60 @@ CONTENT_TYPES = [
     "application/x-www-form-urlencoded",
     "text/plain",
 ]
+
+# Extraction methods a sensor can be pinned to
+EXTRACTION_METHODS = {
+    "auto": "Automatic",
+    "json": "JSON",
+    "xml": "XML (XPath)",
+    "csv": "CSV / TSV",
+    "metrics": "Prometheus / OpenMetrics",
+    "css": "CSS selector",
+    "regex": "Regular expression",
+}
+
+# Extraction backends
+EXTRACTION_BACKENDS = {
+    "auto": "Automatic",
+    "event_loop": "Event loop",
+    "executor": "Executor thread",
+    "process": "Process pool",
+}
+
+# Content encodings that can be requested from the server
+CONTENT_ENCODINGS = {
+    "gzip": "gzip",
+    "deflate": "deflate",
+    "br": "Brotli (br)",
+    "zstd": "Zstandard (zstd)",
+}
+
+# Responses of at least this many bytes are parsed in the executor by "auto"
+EXECUTOR_THRESHOLD = 64 * 1024
+
+# Size of the chunks read from the response when streaming the body
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Worker processes in the integration-wide extraction process pool
+PROCESS_POOL_WORKERS = 2
+
+# hass.data[DOMAIN] key of the shared extraction process pool
+DATA_PROCESS_POOL = "process_pool"
+
+# hass.data[DOMAIN] key of the connectors shared by all entries, by TLS setting
+DATA_CONNECTORS = "connectors"
+
+# hass.data[DOMAIN] key of the fetches shared by entries sending identical
+# requests
+DATA_INFLIGHT = "inflight"
+
+# Open connections per host in a shared connector
+CONNECTIONS_PER_HOST = 10
+
+# XML responses of at least this many bytes are streamed with iterparse when
+# every XPath selector is a simple element path
+XML_ITERPARSE_THRESHOLD = 1024 * 1024
+
+# Seconds to wait for referenced entities to settle before an event-driven
+# refresh
+TEMPLATE_REFRESH_COOLDOWN = 1.0
@@ -3,78 +3,157 @@
 from __future__ import annotations
 
 import asyncio
+import codecs
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import timedelta
-import json
+import hashlib
 import logging
-import re
+import multiprocessing
 from typing import Any
-from xml.etree import ElementTree as ET
 
 import aiohttp
-from bs4 import BeautifulSoup
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.template import Template
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.template import RenderInfo, Template, is_template_string
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .const import (
+    CONF_ACCEPT_ENCODING,
+    CONF_COALESCE_WINDOW,
     CONF_CONTENT_TYPE,
+    CONF_EARLY_STOP,
+    CONF_EXTRACTION_BACKEND,
     CONF_HEADERS,
+    CONF_HTML_STRAINER,
     CONF_INTERVAL,
+    CONF_MAX_BODY_SIZE,
     CONF_METHOD,
     CONF_PAYLOAD,
+    CONF_REFRESH_ON_CHANGE,
     CONF_RETRIES,
-    CONF_SENSOR_COLOR,
-    CONF_SENSOR_DEVICE_CLASS,
-    CONF_SENSOR_ICON,
-    CONF_SENSOR_NAME,
-    CONF_SENSOR_STATE,
-    CONF_SENSOR_TYPE,
-    CONF_SENSOR_UNIT,
     CONF_SENSORS,
+    CONF_STREAMING_JSON,
     CONF_TIMEOUT,
-    CONF_TRACKER_LATITUDE,
-    CONF_TRACKER_LOCATION_NAME,
-    CONF_TRACKER_LONGITUDE,
-    CONF_TRACKER_SOURCE_TYPE,
     CONF_URL,
     CONF_VERIFY_SSL,
+    CONNECTIONS_PER_HOST,
+    DATA_CONNECTORS,
+    DATA_INFLIGHT,
+    DATA_PROCESS_POOL,
+    DEFAULT_ACCEPT_ENCODING,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_EARLY_STOP,
+    DEFAULT_EXTRACTION_BACKEND,
+    DEFAULT_HTML_STRAINER,
     DEFAULT_INTERVAL,
+    DEFAULT_MAX_BODY_SIZE,
+    DEFAULT_REFRESH_ON_CHANGE,
     DEFAULT_RETRIES,
+    DEFAULT_STREAMING_JSON,
     DEFAULT_TIMEOUT,
     DEFAULT_VERIFY_SSL,
     DOMAIN,
+    EXECUTOR_THRESHOLD,
+    PROCESS_POOL_WORKERS,
+    STREAM_CHUNK_SIZE,
+    TEMPLATE_REFRESH_COOLDOWN,
 )
+from .decoders import JSON_DECODE_ERRORS, is_binary, json_dumps, json_loads
+from .decompress import (
+    DecompressionLimitError,
+    accept_encoding,
+    available_encodings,
+    get_decompressor,
+)
+from .extractor import ExtractionPlan, HTTPResponse, extract_in_worker
+from .jsonstream import StreamingJSONExtractor
+from .regexscan import RegexWatcher, can_watch
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class HTTPResponse:
-    """Custom response class for template access."""
+def _get_process_pool(hass: HomeAssistant, user: object) -> ProcessPoolExecutor:
+    """Return the integration-wide extraction process pool, creating it if needed."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    pool_data = domain_data.get(DATA_PROCESS_POOL)
+    if pool_data is None:
+        # Spawn fresh interpreters instead of forking the running event loop
+        pool = ProcessPoolExecutor(
+            max_workers=PROCESS_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        pool_data = domain_data[DATA_PROCESS_POOL] = {"pool": pool, "users": set()}
+
+    pool_data["users"].add(user)
+    return pool_data["pool"]
+
+
+def _release_process_pool(
+    hass: HomeAssistant, user: object, broken: bool = False
+) -> None:
+    """Stop using the process pool and shut it down once it has no users left."""
+    domain_data = hass.data.get(DOMAIN, {})
+    pool_data = domain_data.get(DATA_PROCESS_POOL)
+    if pool_data is None:
+        return
+
+    pool_data["users"].discard(user)
+    if broken or not pool_data["users"]:
+        domain_data.pop(DATA_PROCESS_POOL)
+        pool_data["pool"].shutdown(wait=False, cancel_futures=True)
+
+
+def _get_connector(
+    hass: HomeAssistant, user: object, verify_ssl: bool
+) -> aiohttp.TCPConnector:
+    """Return the shared connector for a TLS setting, creating it if needed."""
+    connectors = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_CONNECTORS, {})
+    connector_data = connectors.get(verify_ssl)
+    if connector_data is None:
+        connector = aiohttp.TCPConnector(
+            ssl=verify_ssl, limit_per_host=CONNECTIONS_PER_HOST
+        )
+        connector_data = connectors[verify_ssl] = {
+            "connector": connector,
+            "users": set(),
+        }
+
+    connector_data["users"].add(user)
+    return connector_data["connector"]
 
-    def __init__(self, text: str, status: int, headers: dict):
-        """Initialize the response."""
-        self.text = text
-        self.status = status
-        self.headers = headers
 
-        # Try to parse as JSON
-        try:
-            self.json = json.loads(text)
-        except (json.JSONDecodeError, TypeError):
-            self.json = None
+async def _async_release_connector(
+    hass: HomeAssistant, user: object, verify_ssl: bool
+) -> None:
+    """Stop using a shared connector and close it once it has no users left."""
+    connectors = hass.data.get(DOMAIN, {}).get(DATA_CONNECTORS, {})
+    connector_data = connectors.get(verify_ssl)
+    if connector_data is None or user not in connector_data["users"]:
+        return
 
-        # Parse as HTML / Soup
-        try:
-            self.soup = BeautifulSoup(text, "lxml")
-        except Exception:
-            self.soup = None
+    connector_data["users"].discard(user)
+    if not connector_data["users"]:
+        connectors.pop(verify_ssl)
+        await connector_data["connector"].close()
 
-        # Parse as XML/HTML
-        try:
-            self.xml = ET.fromstring(text)
-        except Exception:
-            self.xml = None
+
+def _fingerprint(request: bytes, body: bytes) -> bytes:
+    """Return a short hash of a rendered request and its response body."""
+    digest = hashlib.blake2b(request, digest_size=16)
+    digest.update(body)
+    return digest.digest()
+
+
+def _discard_shared(
+    inflight: dict[str, dict[str, Any]], key: str, shared: dict[str, Any]
+) -> None:
+    """Stop sharing a fetch, unless it was replaced in the meantime."""
+    if inflight.get(key) is shared:
+        del inflight[key]
 
 
 class HTTPAgentCoordinator(DataUpdateCoordinator):
@@ -95,6 +174,91 @@ class HTTPAgentCoordinator(DataUpdateCoordinator):
         self.payload = entry_data.get(CONF_PAYLOAD, "")
         self.content_type = entry_data.get(CONF_CONTENT_TYPE, "application/json")
         self.sensors_config = entry_data[CONF_SENSORS]
+        self.extraction_backend = entry_data.get(
+            CONF_EXTRACTION_BACKEND, DEFAULT_EXTRACTION_BACKEND
+        )
+        # Upper bound of the decompressed body in bytes, 0 for no limit
+        self.max_body_size = (
+            entry_data.get(CONF_MAX_BODY_SIZE, DEFAULT_MAX_BODY_SIZE) * 1024
+        )
+        # Only encodings that can be decoded here are offered to the server
+        self.accept_encoding = accept_encoding(
+            available_encodings(
+                entry_data.get(CONF_ACCEPT_ENCODING, DEFAULT_ACCEPT_ENCODING)
+            )
+        )
+
+        # Selectors are compiled once per configuration
+        self.plan = ExtractionPlan(
+            self.sensors_config,
+            html_strainer=entry_data.get(CONF_HTML_STRAINER, DEFAULT_HTML_STRAINER),
+        )
+        # JSONPath expressions starting with a wildcard, filter or recursive
+        # descent need the whole document and cannot be streamed
+        self.streaming_json = bool(
+            entry_data.get(CONF_STREAMING_JSON, DEFAULT_STREAMING_JSON)
+            and self.plan.json_paths
+            and () not in self.plan.json_paths
+        )
+        # Reading can stop early only if no selector needs the whole document
+        # and its patterns match the same way in a prefix of the body
+        self.early_stop = bool(
+            entry_data.get(CONF_EARLY_STOP, DEFAULT_EARLY_STOP)
+            and self.plan.regex_only
+            and all(can_watch(pattern) for pattern in self.plan.regex_patterns)
+        )
+
+        # Fingerprint of the last extracted response, and how often it matched
+        self._last_fingerprint: bytes | None = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # Validators of the last response, sent with the next identical GET
+        self._validators: tuple[str, dict[str, str]] | None = None
+        self.not_modified = 0
+
+        # Seconds identical requests of other entries share a fetch, 0 for off
+        self.coalesce_window = entry_data.get(
+            CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW
+        )
+        self.coalesced_requests = 0
+
+        # Bytes received on the wire and after decompression
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+
+        # Templates are compiled once, strings without template syntax are
+        # sent as they are and a request without any template is built once
+        self._url_template = self._compile_template(self.url)
+        self._header_templates = {
+            key: self._compile_template(value) for key, value in self.headers.items()
+        }
+        self._payload_template = self._compile_template(self.payload)
+        self._static_request = None
+        if (
+            self._url_template is None
+            and self._payload_template is None
+            and not any(self._header_templates.values())
+        ):
+            self._static_request = self._build_request(
+                self.url, self.headers.copy(), self.payload
+            )
+        # Last rendered request, kept until an entity its templates read changes
+        self._rendered_request: dict[str, Any] | None = None
+        self._unsub_template_entities = None
+
+        # Refresh as soon as an entity the templates read changes, once the
+        # changes settle
+        self.refresh_on_change = entry_data.get(
+            CONF_REFRESH_ON_CHANGE, DEFAULT_REFRESH_ON_CHANGE
+        )
+        self._template_refresh = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=TEMPLATE_REFRESH_COOLDOWN,
+            immediate=False,
+            function=self.async_refresh,
+        )
 
         # Session
         self.session = None
@@ -115,144 +279,102 @@ class HTTPAgentCoordinator(DataUpdateCoordinator):
         """Fetch data from HTTP endpoint."""
         if not self.session:
             timeout = aiohttp.ClientTimeout(total=self.timeout)
-            connector = aiohttp.TCPConnector(ssl=self.verify_ssl)
-            self.session = aiohttp.ClientSession(timeout=timeout, connector=connector)
-
-        try:
-            # Render templates in URL, headers, and payload
-            rendered_url = self._render_template(self.url)
-            rendered_headers = self.headers.copy()
-            for key, value in rendered_headers.items():
-                rendered_headers[key] = self._render_template(value)
-
-            rendered_payload = (
-                self._render_template(self.payload) if self.payload else None
+            # Connections are pooled and kept alive across all entries with
+            # the same TLS settings, cookies stay per entry
+            connector = _get_connector(self.hass, self, self.verify_ssl)
+            # Bodies are decompressed while they are read, see _async_iter_body
+            self.session = aiohttp.ClientSession(
+                timeout=timeout,
+                connector=connector,
+                connector_owner=False,
+                json_serialize=json_dumps,
+                auto_decompress=False,
             )
 
-            # Set content type header if we have a payload
-            if rendered_payload and self.content_type:
-                rendered_headers["Content-Type"] = self.content_type
-
-            # Make HTTP request
-            kwargs = {
-                "url": rendered_url,
-                "headers": rendered_headers,
-            }
-
-            if rendered_payload:
-                if self.content_type == "application/json":
-                    try:
-                        kwargs["json"] = json.loads(rendered_payload)
-                    except json.JSONDecodeError:
-                        kwargs["data"] = rendered_payload
-                else:
-                    kwargs["data"] = rendered_payload
+        try:
+            kwargs = self._prepare_request()
+            rendered_url = kwargs["url"]
+            request_kwargs = self._conditional_request(kwargs)
             total_attempts = max(1, int(self.retries) + 1)
 
             for attempt in range(1, total_attempts + 1):
                 try:
-                    async with self.session.request(self.method, **kwargs) as response:
-                        response_text = await response.text()
+                    fetched, body_size = await self._async_fetch_shared(
+                        request_kwargs, reuse_completed=attempt == 1
+                    )
 
-                        # Retry on empty response or non-2xx status
-                        if (
-                            not response_text
-                            or response.status < 200
-                            or response.status >= 300
-                        ):
-                            error_msg = f"HTTP {response.status}"
-                            if not response_text:
-                                error_msg = "Empty response"
+                    # Unchanged since the last response, keep its result
+                    if fetched.status == 304 and self.data is not None:
+                        self.not_modified += 1
+                        _LOGGER.debug(
+                            "Response from %s not modified, skipping download",
+                            rendered_url,
+                        )
+                        return self.data
 
-                            _LOGGER.debug(
-                                "HTTP request attempt %s/%s failed for %s: %s",
-                                attempt,
-                                total_attempts,
-                                rendered_url,
-                                error_msg,
+                    # Retry on empty response or non-2xx status
+                    if not body_size or fetched.status < 200 or fetched.status >= 300:
+                        error_msg = f"HTTP {fetched.status}"
+                        if not body_size:
+                            error_msg = "Empty response"
+
+                        _LOGGER.debug(
+                            "HTTP request attempt %s/%s failed for %s: %s",
+                            attempt,
+                            total_attempts,
+                            rendered_url,
+                            error_msg,
+                        )
+
+                        if attempt == total_attempts:
+                            raise UpdateFailed(
+                                f"Failed to fetch data after {attempt} attempts: {error_msg}"
                             )
 
-                            if attempt == total_attempts:
-                                raise UpdateFailed(
-                                    f"Failed to fetch data after {attempt} attempts: {error_msg}"
-                                )
+                        # wait 1s before next attempt
+                        await asyncio.sleep(1)
 
-                            # wait 1s before next attempt
-                            await asyncio.sleep(1)
+                        continue
 
-                            continue
+                    _LOGGER.debug(
+                        "HTTP request to %s returned status %s",
+                        rendered_url,
+                        fetched.status,
+                    )
 
-                        _LOGGER.debug(
-                            "HTTP request to %s returned status %s",
-                            rendered_url,
-                            response.status,
+                    # Unchanged body for the same request, reuse the last result
+                    fingerprint = None
+                    if fetched.body:
+                        fingerprint = await self._async_fingerprint(
+                            kwargs, fetched.content_type, fetched.body
                         )
+                        if (
+                            fingerprint == self._last_fingerprint
+                            and self.data is not None
+                        ):
+                            self.cache_hits += 1
+                            _LOGGER.debug(
+                                "Response from %s unchanged, skipping extraction",
+                                rendered_url,
+                            )
+                            self._store_validators(kwargs, fetched)
+                            return self.data
+                        self.cache_misses += 1
+
+                    # Parse with this entry's options, sharing parsed forms
+                    # with other entries that received the same response
+                    http_response = fetched.for_plan(
+                        soup_strainer=self.plan.soup_strainer,
+                        xml_paths=self.plan.xml_paths,
+                        regex_scanner=self.plan.regex_scanner,
+                    )
 
-                        # Create custom response object for templates
-                        http_response = HTTPResponse(
-                            text=response_text,
-                            status=response.status,
-                            headers=dict(response.headers),
-                        )
+                    # Extract sensor data
+                    sensor_data = await self._async_extract(http_response)
+                    self._last_fingerprint = fingerprint
+                    self._store_validators(kwargs, fetched)
 
-                        # Extract sensor data
-                        sensor_data = {}
-                        for sensor_config in self.sensors_config:
-                            sensor_name = sensor_config[CONF_SENSOR_NAME]
-                            sensor_type = sensor_config.get(CONF_SENSOR_TYPE, "sensor")
-
-                            # Base sensor values
-                            sensor_values = {
-                                "type": sensor_type,
-                                "state": self._extract_value_auto(
-                                    http_response,
-                                    sensor_config.get(CONF_SENSOR_STATE, ""),
-                                ),
-                                "icon": self._extract_value_auto(
-                                    http_response,
-                                    sensor_config.get(CONF_SENSOR_ICON, ""),
-                                ),
-                                "color": self._extract_value_auto(
-                                    http_response,
-                                    sensor_config.get(CONF_SENSOR_COLOR, ""),
-                                ),
-                                "device_class": sensor_config.get(
-                                    CONF_SENSOR_DEVICE_CLASS, ""
-                                ),
-                                "unit": sensor_config.get(CONF_SENSOR_UNIT, ""),
-                            }
-
-                            # Add device tracker specific data
-                            if sensor_type == "device_tracker":
-                                sensor_values.update(
-                                    {
-                                        "latitude": self._extract_value_auto(
-                                            http_response,
-                                            sensor_config.get(
-                                                CONF_TRACKER_LATITUDE, ""
-                                            ),
-                                        ),
-                                        "longitude": self._extract_value_auto(
-                                            http_response,
-                                            sensor_config.get(
-                                                CONF_TRACKER_LONGITUDE, ""
-                                            ),
-                                        ),
-                                        "location_name": self._extract_value_auto(
-                                            http_response,
-                                            sensor_config.get(
-                                                CONF_TRACKER_LOCATION_NAME, ""
-                                            ),
-                                        ),
-                                        "source_type": sensor_config.get(
-                                            CONF_TRACKER_SOURCE_TYPE, "gps"
-                                        ),
-                                    }
-                                )
-
-                            sensor_data[sensor_name] = sensor_values
-
-                        return sensor_data
+                    return sensor_data
 
                 except (asyncio.TimeoutError, aiohttp.ClientError) as err:
                     err_detail = str(err) or type(err).__name__
@@ -284,176 +406,462 @@ class HTTPAgentCoordinator(DataUpdateCoordinator):
         except Exception as err:
             raise UpdateFailed(f"Unexpected error: {err}") from err
 
-    def _render_template(self, template_string: str) -> str:
-        """Render a template string."""
-        if not template_string:
+    def _compile_template(self, template_string: str) -> Template | None:
+        """Return a template to render, or None if the string is static."""
+        if not template_string or not is_template_string(template_string):
+            return None
+        return Template(template_string, self.hass)
+
+    def _render_template(
+        self,
+        template: Template | None,
+        template_string: str,
+        render_infos: list[RenderInfo | None],
+    ) -> str:
+        """Render a compiled template, or return the static string.
+
+        What the template read while rendering is added to `render_infos`,
+        or None if rendering failed.
+        """
+        if template is None:
             return template_string
 
         try:
-            template = Template(template_string, self.hass)
-            return template.async_render()
+            render_info = template.async_render_to_info()
+            render_infos.append(render_info)
+            return render_info.result()
         except Exception as err:
             _LOGGER.warning("Error rendering template '%s': %s", template_string, err)
+            render_infos.append(None)
             return template_string
 
-    def _extract_value_auto(self, response: HTTPResponse, selector: str) -> Any:
-        """Extract value from response using auto-detected method."""
-        if not selector:
-            return None
+    def _prepare_request(self) -> dict[str, Any]:
+        """Return the request arguments with all templates rendered.
+
+        The rendered request is reused until a state the templates read
+        changes. Templates that use the time, read whole domains or failed
+        to render are rendered again on every refresh.
+        """
+        if self._static_request is not None:
+            return self._static_request
+        if self._rendered_request is not None:
+            return self._rendered_request
+
+        render_infos: list[RenderInfo | None] = []
+        rendered_headers = {
+            key: self._render_template(self._header_templates[key], value, render_infos)
+            for key, value in self.headers.items()
+        }
+        kwargs = self._build_request(
+            self._render_template(self._url_template, self.url, render_infos),
+            rendered_headers,
+            self._render_template(self._payload_template, self.payload, render_infos),
+        )
 
-        # Try different extraction methods in order of preference
-        methods_to_try = []
+        self._async_untrack_template_entities()
+        cacheable = not any(
+            info is None
+            or info.has_time
+            or info.all_states
+            or info.all_states_lifecycle
+            or info.domains
+            or info.domains_lifecycle
+            for info in render_infos
+        )
 
-        # Determine extraction methods based on content type and available data
-        content_type = response.headers.get("content-type", "").lower()
+        entities = set().union(
+            *(info.entities for info in render_infos if info is not None)
+        )
+        if entities and (cacheable or self.refresh_on_change):
+            self._unsub_template_entities = async_track_state_change_event(
+                self.hass, entities, self._async_template_entity_changed
+            )
+        if cacheable:
+            self._rendered_request = kwargs
+        return kwargs
+
+    @callback
+    def _async_template_entity_changed(self, event: Event) -> None:
+        """Render the request again on the next refresh, and refresh if enabled."""
+        self._rendered_request = None
+        self._async_untrack_template_entities()
+        if self.refresh_on_change:
+            self._template_refresh.async_schedule_call()
+
+    @callback
+    def _async_untrack_template_entities(self) -> None:
+        """Stop listening to the entities of the last rendered request."""
+        if self._unsub_template_entities is not None:
+            self._unsub_template_entities()
+            self._unsub_template_entities = None
+
+    def _build_request(
+        self, url: str, headers: dict[str, str], payload: str | None
+    ) -> dict[str, Any]:
+        """Return the request arguments for a rendered URL, headers and payload."""
+        if not any(key.lower() == "accept-encoding" for key in headers):
+            headers["Accept-Encoding"] = self.accept_encoding
+
+        # Set content type header if we have a payload
+        if payload and self.content_type:
+            headers["Content-Type"] = self.content_type
+
+        kwargs = {
+            "url": url,
+            "headers": headers,
+        }
 
-        if "json" in content_type or response.json is not None:
-            methods_to_try.append(("json", self._extract_json_value, response.json))
+        if payload:
+            if self.content_type == "application/json":
+                try:
+                    kwargs["json"] = json_loads(payload)
+                except JSON_DECODE_ERRORS:
+                    kwargs["data"] = payload
+            else:
+                kwargs["data"] = payload
+
+        return kwargs
+
+    @property
+    def cache_stats(self) -> dict[str, Any]:
+        """Return how often extraction was skipped for an unchanged response."""
+        total = self.cache_hits + self.cache_misses
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": round(self.cache_hits / total, 3) if total else None,
+            "not_modified": self.not_modified,
+        }
 
-        if "xml" in content_type or response.xml is not None:
-            methods_to_try.append(("xml", self._extract_xml_value, response.xml))
+    @property
+    def transfer_stats(self) -> dict[str, Any]:
+        """Return the bytes received compressed and after decompression."""
+        return {
+            "accept_encoding": self.accept_encoding,
+            "coalesced_requests": self.coalesced_requests,
+            "wire_bytes": self.wire_bytes,
+            "decoded_bytes": self.decoded_bytes,
+            "savings": (
+                round(1 - self.wire_bytes / self.decoded_bytes, 3)
+                if self.decoded_bytes
+                else None
+            ),
+        }
 
-        if "html" in content_type or response.soup is not None:
-            methods_to_try.append(("css", self._extract_css_value, response.soup))
+    def _request_key(self, kwargs: dict[str, Any]) -> str:
+        """Return a string identifying a rendered request."""
+        return repr(
+            (
+                self.method,
+                kwargs["url"],
+                sorted(kwargs["headers"].items()),
+                kwargs.get("json", kwargs.get("data")),
+            )
+        )
 
-        if response.text is not None:
-            methods_to_try.append(("regex", self._extract_regex_value, response.text))
+    def _conditional_request(self, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Add the validators of the last response to a GET of the same request.
+
+        Headers configured on the entry take precedence.
+        """
+        if self.method != "GET" or self._validators is None:
+            return kwargs
+
+        request_key, validators = self._validators
+        if request_key != self._request_key(kwargs):
+            return kwargs
+
+        headers = kwargs["headers"].copy()
+        configured = {key.lower() for key in headers}
+        for name, value in validators.items():
+            if name.lower() not in configured:
+                headers[name] = value
+        return {**kwargs, "headers": headers}
+
+    def _store_validators(self, kwargs: dict[str, Any], response: HTTPResponse) -> None:
+        """Remember the ETag and Last-Modified of a response to a request."""
+        validators = {}
+        if etag := response.header("ETag"):
+            validators["If-None-Match"] = etag
+        if last_modified := response.header("Last-Modified"):
+            validators["If-Modified-Since"] = last_modified
+        self._validators = (
+            (self._request_key(kwargs), validators) if validators else None
+        )
 
-        # If no content type match, try all available methods
-        if not methods_to_try:
-            if response.json is not None:
-                methods_to_try.append(("json", self._extract_json_value, response.json))
-            if response.xml is not None:
-                methods_to_try.append(("xml", self._extract_xml_value, response.xml))
-            if response.soup is not None:
-                methods_to_try.append(("css", self._extract_css_value, response.soup))
+    async def _async_fingerprint(
+        self, kwargs: dict[str, Any], content_type: str, body: bytes
+    ) -> bytes:
+        """Hash the rendered request together with the response body.
+
+        The response content type is included because it decides how the
+        body is decoded and which extraction method is used.
+        """
+        request = repr((self._request_key(kwargs), content_type)).encode()
+        if self._resolve_backend(len(body)) == "event_loop":
+            return _fingerprint(request, body)
+        return await self.hass.async_add_executor_job(_fingerprint, request, body)
+
+    def _resolve_backend(self, body_size: int) -> str:
+        """Return the extraction backend to use for a body of the given size."""
+        if self.extraction_backend != "auto":
+            return self.extraction_backend
+        return "executor" if body_size >= EXECUTOR_THRESHOLD else "event_loop"
+
+    async def _async_fetch(self, kwargs: dict[str, Any]) -> tuple[HTTPResponse, int]:
+        """Send the request and read the response.
+
+        Returns the response and the number of body bytes received, which
+        differs from the body length when JSON was parsed while streaming.
+        """
+        async with self.session.request(self.method, **kwargs) as response:
+            if response.status == 304:
+                # Not modified, there is no body to read
+                return HTTPResponse(b"", response.status, dict(response.headers)), 0
+
+            # Binary formats cannot be streamed as JSON text
+            if self.streaming_json and not is_binary(response.content_type):
+                body_size, json_data = await self._async_read_json_stream(response)
+                return (
+                    HTTPResponse(
+                        b"",
+                        response.status,
+                        dict(response.headers),
+                        response.charset,
+                        json_data=json_data,
+                    ),
+                    body_size,
+                )
 
-        # Try each method until one succeeds
-        for method_name, extract_func, data in methods_to_try:
-            if data is not None:
-                try:
-                    result = extract_func(data, selector)
-                    if result is not None:
-                        _LOGGER.debug(
-                            "Successfully extracted value using %s method with selector '%s': %s",
-                            method_name,
-                            selector,
-                            result,
-                        )
-                        return result
-                except Exception as err:
-                    _LOGGER.debug(
-                        "Failed to extract value using %s method with selector '%s': %s",
-                        method_name,
-                        selector,
-                        err,
-                    )
-                    continue
+            body = await self._async_read_body(response)
+            return (
+                HTTPResponse(
+                    body, response.status, dict(response.headers), response.charset
+                ),
+                len(body),
+            )
 
-        _LOGGER.warning(
-            "Could not extract value with selector '%s' using any available method",
-            selector,
+    async def _async_fetch_shared(
+        self, kwargs: dict[str, Any], reuse_completed: bool = True
+    ) -> tuple[HTTPResponse, int]:
+        """Send the request, or share an identical one of another entry.
+
+        Entries rendering the same request while it is in progress, or
+        within the coalescing window after it completed, share a single
+        fetch and its response. A completed fetch is only reused when
+        `reuse_completed` is set, so retries always send a new request.
+        Entries that stream or stop reading early keep their own fetch,
+        since their body depends on their selectors.
+        """
+        if not self.coalesce_window or self.streaming_json or self.early_stop:
+            return await self._async_fetch(kwargs)
+
+        inflight = self.hass.data.setdefault(DOMAIN, {}).setdefault(DATA_INFLIGHT, {})
+        # The fetch runs on the session of the entry that started it, so only
+        # entries with the same session settings share it
+        key = repr(
+            (
+                self._request_key(kwargs),
+                self.verify_ssl,
+                self.max_body_size,
+                self.timeout,
+            )
         )
-        return None
+        shared = inflight.get(key)
+        task = shared["task"] if shared is not None else None
+        # An entry never reuses its own completed fetch, which would stretch
+        # its update interval to the coalescing window
+        if task is None or (
+            task.done()
+            and (
+                not reuse_completed
+                or shared["owner"] is self
+                or task.cancelled()
+                or task.exception()
+            )
+        ):
+            task = self.hass.async_create_task(self._async_fetch(kwargs))
+            shared = {"task": task, "owner": self}
+            inflight[key] = shared
+            task.add_done_callback(
+                lambda _: self.hass.loop.call_later(
+                    self.coalesce_window, _discard_shared, inflight, key, shared
+                )
+            )
+        else:
+            self.coalesced_requests += 1
+            _LOGGER.debug("Sharing response of identical request to %s", kwargs["url"])
 
-    def _extract_json_value(self, json_data: dict | list, path: str) -> Any:
-        """Extract value from JSON using JSONPath-like syntax."""
-        if not json_data:
-            return None
+        # Cancelling this refresh must not cancel the fetch of other entries
+        return await asyncio.shield(task)
 
-        parts = path.split(".")
-        current = json_data
+    async def _async_iter_body(
+        self, response: aiohttp.ClientResponse
+    ) -> AsyncIterator[bytes]:
+        """Yield the body in chunks, decompressed as they arrive.
 
-        for part in parts:
-            if isinstance(current, dict):
-                current = current.get(part)
-            elif isinstance(current, list):
+        The connection is closed as soon as the body is known to be larger
+        than the configured maximum, before any more of it is read.
+        """
+        try:
+            decompressor = get_decompressor(
+                response.headers.get("Content-Encoding", ""), self.max_body_size
+            )
+        except ValueError as err:
+            raise UpdateFailed(str(err)) from err
+
+        if (
+            self.max_body_size
+            and response.content_length is not None
+            and response.content_length > self.max_body_size
+        ):
+            self._abort_oversized(response)
+
+        body_size = 0
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            self.wire_bytes += len(chunk)
+            if decompressor is not None:
                 try:
-                    index = int(part)
-                    current = current[index]
-                except (ValueError, IndexError):
-                    return None
-            else:
-                return None
-
-            if current is None:
-                return None
-
-        return current
+                    chunk = decompressor.decompress(chunk)
+                except DecompressionLimitError:
+                    self._abort_oversized(response)
+            self.decoded_bytes += len(chunk)
+            body_size += len(chunk)
+            if self.max_body_size and body_size > self.max_body_size:
+                self._abort_oversized(response)
+            if chunk:
+                yield chunk
+
+        if decompressor is None:
+            return
+        try:
+            chunk = decompressor.flush()
+        except DecompressionLimitError:
+            self._abort_oversized(response)
+        if chunk:
+            self.decoded_bytes += len(chunk)
+            yield chunk
+
+    def _abort_oversized(self, response: aiohttp.ClientResponse) -> None:
+        """Close the connection of a response that exceeds the maximum size."""
+        response.close()
+        raise UpdateFailed(
+            f"Response body exceeds the maximum size of {self.max_body_size} bytes"
+        )
 
-    def _extract_xml_value(self, xml_data: ET.Element, xpath: str) -> Any:
-        """Extract value from XML using XPath."""
-        if xml_data is None:
-            return None
+    async def _async_read_body(self, response: aiohttp.ClientResponse) -> bytes:
+        """Read the body, stopping once every regex selector has matched.
+
+        In early stop mode the connection is closed as soon as all regular
+        expressions have matched in the complete lines received so far, and
+        only that part of the body is extracted.
+        """
+        watcher = None
+        if self.early_stop:
+            watcher = RegexWatcher(
+                self.plan.regex_patterns, response.charset or "utf-8"
+            )
 
+        chunks = []
+        async for chunk in self._async_iter_body(response):
+            chunks.append(chunk)
+            if watcher is not None and watcher.feed(chunk):
+                _LOGGER.debug(
+                    "All regular expressions matched after %s bytes, closing connection",
+                    sum(len(chunk) for chunk in chunks),
+                )
+                response.close()
+                # Extract from the complete lines the watcher searched
+                body = b"".join(chunks)
+                return body[: body.rfind(b"\n") + 1]
+
+        return b"".join(chunks)
+
+    async def _async_read_json_stream(
+        self, response: aiohttp.ClientResponse
+    ) -> tuple[int, Any]:
+        """Stream the body through the incremental JSON extractor.
+
+        Returns the number of bytes received and the sparse JSON document.
+        Reading stops as soon as every JSON path has been resolved.
+        """
+        extractor = StreamingJSONExtractor(self.plan.json_paths)
         try:
-            elements = xml_data.findall(xpath)
-            if elements:
-                return elements[0].text
-        except Exception:
-            pass
-
-        return None
+            decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(
+                errors="replace"
+            )
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        body_size = 0
+        async for chunk in self._async_iter_body(response):
+            body_size += len(chunk)
+            text = decoder.decode(chunk)
+            if self._resolve_backend(body_size) == "event_loop":
+                done = extractor.feed(text)
+            else:
+                done = await self.hass.async_add_executor_job(extractor.feed, text)
 
-    def _extract_css_value(self, soup: BeautifulSoup, selector: str) -> Any:
-        """Extract value from HTML using CSS selector."""
-        if soup is None:
-            return None
+            if done:
+                _LOGGER.debug(
+                    "All JSON paths resolved after %s bytes, closing connection",
+                    body_size,
+                )
+                response.close()
+                break
+        else:
+            extractor.feed(decoder.decode(b"", final=True))
 
-        try:
-            element = soup.select_one(selector)
-            if element:
-                return element.get_text(strip=True)
-        except Exception:
-            pass
+        extractor.close()
+        return body_size, extractor.result
 
-        return None
+    async def _async_extract(self, http_response: HTTPResponse) -> dict[str, Any]:
+        """Decode, parse and extract sensor data on the configured backend."""
+        if not http_response.body:
+            # The body was parsed while streaming, only the sparse tree is left
+            return self.plan.extract(http_response)
 
-    def _extract_regex_value(self, text: str, selector: str) -> Any:
-        """Extract value from text using regular expressions."""
-        if not (selector.startswith("/") or selector.count("/") < 2):
-            return None
+        backend = self._resolve_backend(len(http_response.body))
 
-        last_slash = selector.rfind("/")
-        pattern = selector[1:last_slash]
-        flags_str = selector[last_slash + 1 :]
-
-        flag_map = {
-            "i": re.I,
-            "m": re.M,
-            "s": re.S,
-            "x": re.X,
-            "a": re.A,
-            "l": re.L,
-        }
+        if backend == "executor":
+            return await self.hass.async_add_executor_job(
+                self.plan.extract, http_response
+            )
 
-        re_flags = 0
-        for f in flags_str:
-            if f.lower() in flag_map:
-                re_flags |= flag_map[f.lower()]
-            else:
-                _LOGGER.debug(
-                    "Unhandled regex flag '%s'",
-                    f,
+        if backend == "process":
+            pool = _get_process_pool(self.hass, self)
+            try:
+                return await self.hass.loop.run_in_executor(
+                    pool,
+                    extract_in_worker,
+                    self.plan.key,
+                    self.sensors_config,
+                    self.plan.options,
+                    http_response.body,
+                    http_response.status,
+                    http_response.headers,
+                    http_response.encoding,
                 )
-                return None
+            except BrokenProcessPool as err:
+                # Start a fresh pool on the next refresh
+                _release_process_pool(self.hass, self, broken=True)
+                raise UpdateFailed(f"Extraction worker process died: {err}") from err
 
-        try:
-            match = re.search(pattern, text, re_flags)
-            if match and match.lastindex is not None:
-                if match.lastindex == 1:
-                    return match.group(1)
-                elif match.lastindex > 1:
-                    return "|".join(
-                        match.group(i) for i in range(1, match.lastindex + 1)
-                    )
-        except Exception:
-            pass
-
-        return None
+        return self.plan.extract(http_response)
 
     async def async_close(self) -> None:
-        """Close the HTTP session."""
+        """Close the HTTP session and release the shared connector and process pool."""
+        self._async_untrack_template_entities()
+        self._template_refresh.async_shutdown()
+        # Fetches on the session closed below must not be shared any more;
+        # entries already waiting for one retry if it fails
+        inflight = self.hass.data.get(DOMAIN, {}).get(DATA_INFLIGHT, {})
+        for key, shared in list(inflight.items()):
+            if shared["owner"] is self:
+                del inflight[key]
         if self.session:
             await self.session.close()
             self.session = None
+        await _async_release_connector(self.hass, self, self.verify_ssl)
+
+        _release_process_pool(self.hass, self)
@@ -0,0 +1,139 @@
+"""Body decoders for HTTP Agent.
+
+JSON is decoded with orjson when it is installed (it ships with Home
+Assistant) and with the standard library otherwise. Both accept the raw
+response bytes, so UTF-8 bodies are parsed without first being decoded to a
+string. orjson is only a faster path: documents it rejects (NaN and
+Infinity) or would parse less precisely (integers beyond 64 bits) are
+handed to the standard library, so nothing that parsed before fails now.
+Request payloads are serialized the same way: values orjson cannot write
+(integers beyond 64 bits) or would write differently (NaN and Infinity
+become null) are serialized by the standard library.
+
+MessagePack and CBOR bodies are decoded with msgpack and cbor2, which are
+requirements of the integration; if either failed to install, responses of
+that type log a warning instead of breaking the import. They produce the
+same dicts and lists as JSON, so JSON path selectors work on them unchanged.
+"""
+
+from __future__ import annotations
+
+import codecs
+from collections.abc import Callable
+import json
+import logging
+import re
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is bundled with Home Assistant
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# Charsets whose bytes can be handed to the JSON decoder as they are
+_UTF8_CHARSETS = {"utf-8", "utf8", "utf_8"}
+
+# Raised by every JSON decoder on invalid input (orjson.JSONDecodeError is a
+# subclass of json.JSONDecodeError)
+JSON_DECODE_ERRORS = (ValueError, TypeError)
+
+# Media types of binary formats decoded into JSON-like structures
+MSGPACK_TYPES = {
+    "application/msgpack",
+    "application/x-msgpack",
+    "application/vnd.msgpack",
+}
+CBOR_TYPES = {"application/cbor"}
+
+
+# Digit runs long enough to be an integer orjson turns into a float
+_LONG_NUMBER = re.compile(r"\d{19}")
+_LONG_NUMBER_BYTES = re.compile(rb"\d{19}")
+
+
+def _orjson_loads(data: bytes | str) -> Any:
+    """Parse JSON with orjson, or with the standard library where it differs."""
+    pattern = _LONG_NUMBER if isinstance(data, str) else _LONG_NUMBER_BYTES
+    if pattern.search(data) is None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def _orjson_dumps(value: Any) -> str:
+    """Serialize a value with orjson, or with the standard library where it differs."""
+    try:
+        data = orjson.dumps(value)
+    except TypeError:
+        return json.dumps(value)
+    # orjson writes NaN and Infinity as null
+    if b"null" in data:
+        return json.dumps(value)
+    return data.decode()
+
+
+if orjson is not None:
+    JSON_DECODER = "orjson"
+    json_loads = _orjson_loads
+    json_dumps = _orjson_dumps
+else:
+    JSON_DECODER = "json"
+    json_loads = json.loads
+    json_dumps = json.dumps
+
+
+def is_utf8(encoding: str | None) -> bool:
+    """Return True if a body in this charset can be parsed from bytes."""
+    return encoding is None or encoding.lower() in _UTF8_CHARSETS
+
+
+def json_loads_body(body: bytes) -> Any:
+    """Parse a UTF-8 response body as JSON, ignoring a byte order mark."""
+    if body.startswith(codecs.BOM_UTF8):
+        body = body[len(codecs.BOM_UTF8) :]
+    return json_loads(body)
+
+
+def _msgpack_loads(body: bytes) -> Any:
+    """Decode a MessagePack body."""
+    return msgpack.unpackb(body, raw=False, strict_map_key=False)
+
+
+def _missing_decoder(package: str) -> Callable[[bytes], Any]:
+    """Return a decoder that reports a missing package."""
+
+    def decode(body: bytes) -> Any:
+        _LOGGER.warning(
+            "Response needs the %s package, which is not installed", package
+        )
+        return None
+
+    return decode
+
+
+def is_binary(media_type: str) -> bool:
+    """Return True if the media type is a binary JSON-like format."""
+    return media_type in MSGPACK_TYPES or media_type in CBOR_TYPES
+
+
+def binary_loads(media_type: str) -> Callable[[bytes], Any] | None:
+    """Return the decoder for a binary media type, or None if it is not one."""
+    if media_type in MSGPACK_TYPES:
+        return _msgpack_loads if msgpack is not None else _missing_decoder("msgpack")
+    if media_type in CBOR_TYPES:
+        return cbor2.loads if cbor2 is not None else _missing_decoder("cbor2")
+    return None
@@ -0,0 +1,229 @@
+"""Content-Encoding negotiation and streaming decompression for HTTP Agent.
+
+gzip and deflate are always available through zlib. Brotli needs the
+brotli (or brotlicffi) package and Zstandard the zstandard package, or the
+compression.zstd module of newer Python versions. Encodings whose package is
+missing are left out of the Accept-Encoding header, so a server never sends
+a body that cannot be decoded.
+
+Bodies are decompressed chunk by chunk as they arrive, so compressed bytes
+are never buffered as a whole before decoding, and the decoded size is
+checked while a chunk is expanded.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Protocol
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# Accepts both zlib and gzip headers
+_ZLIB_AUTO_WBITS = 32 + zlib.MAX_WBITS
+
+
+# Largest piece of output a decoder produces at a time while it checks the
+# size limit
+_OUTPUT_STEP = 64 * 1024
+
+
+class DecompressionLimitError(Exception):
+    """Raised when a body decompresses to more than the allowed size."""
+
+
+class Decompressor(Protocol):
+    """Incremental decoder of one content coding."""
+
+    def decompress(self, chunk: bytes) -> bytes:
+        """Return the decoded bytes of the next chunk."""
+
+    def flush(self) -> bytes:
+        """Return the bytes still buffered at the end of the body."""
+
+
+class _LimitedDecompressor:
+    """Base of the decoders, counting their output against a size limit.
+
+    The limit is checked while a chunk is decoded, so a small chunk that
+    expands enormously is stopped before its output is held in memory.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """Initialize the decoder for at most `max_size` bytes, 0 for no limit."""
+        self._max_size = max_size
+        self._size = 0
+
+    @property
+    def _max_length(self) -> int:
+        """Return the most output that can still be taken, plus one byte."""
+        return self._max_size - self._size + 1 if self._max_size else 0
+
+    def _count(self, output: bytes) -> bytes:
+        """Add decoded output to the size, raising once it exceeds the limit."""
+        self._size += len(output)
+        if self._max_size and self._size > self._max_size:
+            raise DecompressionLimitError(
+                f"Body decompresses to more than {self._max_size} bytes"
+            )
+        return output
+
+    def flush(self) -> bytes:
+        """Return the bytes still buffered at the end of the body."""
+        return b""
+
+
+class _ZlibDecompressor(_LimitedDecompressor):
+    """gzip and deflate decoder, tolerating deflate sent without zlib header."""
+
+    def __init__(self, max_size: int = 0) -> None:
+        """Initialize the decoder."""
+        super().__init__(max_size)
+        self._decoder = zlib.decompressobj(_ZLIB_AUTO_WBITS)
+        self._started = False
+
+    def decompress(self, chunk: bytes) -> bytes:
+        """Return the decoded bytes of the next chunk."""
+        if not self._started:
+            self._started = True
+            try:
+                return self._decode(chunk)
+            except zlib.error:
+                # Raw deflate stream, as sent by some servers
+                self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+        return self._decode(chunk)
+
+    def _decode(self, chunk: bytes) -> bytes:
+        """Decode a chunk, stopping one byte past the limit."""
+        # Input left over at the limit stays in unconsumed_tail, and the
+        # output is then too large anyway
+        return self._count(self._decoder.decompress(chunk, self._max_length))
+
+    def flush(self) -> bytes:
+        """Return the bytes still buffered at the end of the body."""
+        return self._count(self._decoder.flush())
+
+
+class _BrotliDecompressor(_LimitedDecompressor):
+    """Brotli decoder."""
+
+    def __init__(self, max_size: int = 0) -> None:
+        """Initialize the decoder."""
+        super().__init__(max_size)
+        self._decoder = brotli.Decompressor()
+        # brotli names the method process, brotlicffi decompress. Only
+        # brotli 1.1 and later can bound the output of a call.
+        self._process = getattr(self._decoder, "process", None) or getattr(
+            self._decoder, "decompress"
+        )
+        self._bounded = hasattr(self._decoder, "can_accept_more_data")
+
+    def decompress(self, chunk: bytes) -> bytes:
+        """Return the decoded bytes of the next chunk."""
+        if not self._bounded:
+            return self._count(self._process(chunk))
+
+        output = [self._count(self._process(chunk, output_buffer_limit=_OUTPUT_STEP))]
+        while not self._decoder.can_accept_more_data():
+            output.append(
+                self._count(self._process(b"", output_buffer_limit=_OUTPUT_STEP))
+            )
+        return b"".join(output)
+
+
+class _ZstdDecompressor(_LimitedDecompressor):
+    """Zstandard decoder, accepting several concatenated frames."""
+
+    def __init__(self, max_size: int = 0) -> None:
+        """Initialize the decoder."""
+        super().__init__(max_size)
+        self._output: list[bytes] = []
+        if zstandard is not None:
+            # The writer hands over the output in pieces as it is decoded
+            self._writer = zstandard.ZstdDecompressor().stream_writer(
+                self, write_size=_OUTPUT_STEP
+            )
+        else:
+            self._writer = None
+            self._decoder = zstd.ZstdDecompressor()
+
+    def write(self, data: bytes) -> int:
+        """Take a piece of output from the zstandard stream writer."""
+        self._output.append(self._count(bytes(data)))
+        return len(data)
+
+    def decompress(self, chunk: bytes) -> bytes:
+        """Return the decoded bytes of the next chunk."""
+        if self._writer is not None:
+            self._output = []
+            self._writer.write(chunk)
+            return b"".join(self._output)
+
+        output = []
+        while chunk:
+            output.append(
+                self._count(self._decoder.decompress(chunk, self._max_length or -1))
+            )
+            chunk = self._decoder.unused_data if self._decoder.eof else b""
+            if chunk:
+                self._decoder = zstd.ZstdDecompressor()
+        return b"".join(output)
+
+
+# Supported content codings and whether the package they need is installed
+_DECOMPRESSORS = {
+    "gzip": _ZlibDecompressor,
+    "deflate": _ZlibDecompressor,
+    "br": _BrotliDecompressor if brotli is not None else None,
+    "zstd": (_ZstdDecompressor if zstandard is not None or zstd is not None else None),
+}
+
+
+def available_encodings(encodings: list[str]) -> list[str]:
+    """Return the requested encodings that can be decoded, in order."""
+    available = [e for e in encodings if _DECOMPRESSORS.get(e) is not None]
+    if len(available) < len(encodings):
+        _LOGGER.debug(
+            "Content encodings not accepted, decoder not installed: %s",
+            [e for e in encodings if e not in available],
+        )
+    return available
+
+
+def accept_encoding(encodings: list[str]) -> str:
+    """Return the Accept-Encoding header value for the given encodings."""
+    return ", ".join(encodings) if encodings else "identity"
+
+
+def get_decompressor(content_encoding: str, max_size: int = 0) -> Decompressor | None:
+    """Return a decoder for a Content-Encoding, or None for identity.
+
+    The decoder raises DecompressionLimitError once its output exceeds
+    `max_size` bytes, 0 for no limit. Raises ValueError for an encoding that
+    cannot be decoded.
+    """
+    encoding = content_encoding.strip().lower()
+    if encoding in ("", "identity"):
+        return None
+    factory = _DECOMPRESSORS.get(encoding)
+    if factory is None:
+        raise ValueError(f"Unsupported Content-Encoding: {content_encoding}")
+    return factory(max_size)
@@ -13,13 +13,14 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
+    CONF_SENSOR_ITEMS,
     CONF_SENSOR_NAME,
     CONF_SENSOR_TYPE,
     CONF_SENSORS,
     DOMAIN,
 )
 from .coordinator import HTTPAgentCoordinator
-from .helpers import get_sensor_config
+from .helpers import async_setup_fan_out, get_sensor_config, item_unique_id
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -38,15 +39,33 @@ async def async_setup_entry(
         data.update(entry.options)
 
     trackers = []
+    fan_out_names = []
     for sensor_config in data[CONF_SENSORS]:
         # Only create device trackers of type "device_tracker"
         if sensor_config.get(CONF_SENSOR_TYPE, "sensor") == "device_tracker":
             sensor_name = sensor_config[CONF_SENSOR_NAME]
-            trackers.append(HTTPAgentDeviceTracker(coordinator, entry, sensor_name))
+            if sensor_config.get(CONF_SENSOR_ITEMS):
+                fan_out_names.append(sensor_name)
+            else:
+                trackers.append(HTTPAgentDeviceTracker(coordinator, entry, sensor_name))
 
     if trackers:
         async_add_entities(trackers)
 
+    # Fan-out trackers get one entity per element, managed on every refresh
+    for sensor_name in fan_out_names:
+        async_setup_fan_out(
+            hass,
+            entry,
+            coordinator,
+            "device_tracker",
+            sensor_name,
+            async_add_entities,
+            lambda key, name=sensor_name: HTTPAgentItemDeviceTracker(
+                coordinator, entry, name, key
+            ),
+        )
+
 
 class HTTPAgentDeviceTracker(CoordinatorEntity, TrackerEntity):
     """HTTP Agent device tracker."""
@@ -68,6 +87,11 @@ class HTTPAgentDeviceTracker(CoordinatorEntity, TrackerEntity):
 
         self.sensor_config = get_sensor_config(entry, sensor_name)
 
+    @property
+    def sensor_data(self) -> dict[str, Any]:
+        """Return the values extracted for this entity."""
+        return (self.coordinator.data or {}).get(self.sensor_name, {})
+
     @property
     def name(self) -> str:
         """Return the name of the device tracker."""
@@ -79,7 +103,7 @@ class HTTPAgentDeviceTracker(CoordinatorEntity, TrackerEntity):
         if not self.coordinator.data:
             return None
 
-        sensor_data = self.coordinator.data.get(self.sensor_name, {})
+        sensor_data = self.sensor_data
         lat = sensor_data.get("latitude")
 
         if lat is not None:
@@ -99,7 +123,7 @@ class HTTPAgentDeviceTracker(CoordinatorEntity, TrackerEntity):
         if not self.coordinator.data:
             return None
 
-        sensor_data = self.coordinator.data.get(self.sensor_name, {})
+        sensor_data = self.sensor_data
         lng = sensor_data.get("longitude")
 
         if lng is not None:
@@ -119,7 +143,7 @@ class HTTPAgentDeviceTracker(CoordinatorEntity, TrackerEntity):
         if not self.coordinator.data:
             return None
 
-        sensor_data = self.coordinator.data.get(self.sensor_name, {})
+        sensor_data = self.sensor_data
         location = sensor_data.get("location_name")
 
         # Fallback to state if no location_name is provided
@@ -134,7 +158,7 @@ class HTTPAgentDeviceTracker(CoordinatorEntity, TrackerEntity):
         if not self.coordinator.data:
             return SourceType.GPS
 
-        sensor_data = self.coordinator.data.get(self.sensor_name, {})
+        sensor_data = self.sensor_data
         source = sensor_data.get("source_type", "gps")
 
         # Convert string to SourceType
@@ -153,7 +177,7 @@ class HTTPAgentDeviceTracker(CoordinatorEntity, TrackerEntity):
         if not self.coordinator.data:
             return None
 
-        sensor_data = self.coordinator.data.get(self.sensor_name, {})
+        sensor_data = self.sensor_data
         icon = sensor_data.get("icon")
 
         # If icon is provided, ensure it starts with mdi:
@@ -168,8 +192,9 @@ class HTTPAgentDeviceTracker(CoordinatorEntity, TrackerEntity):
         if not self.coordinator.data:
             return {}
 
-        sensor_data = self.coordinator.data.get(self.sensor_name, {})
-        attributes = {}
+        sensor_data = self.sensor_data
+        # Attributes from the sensor's attribute mapping
+        attributes = dict(sensor_data.get("attributes") or {})
 
         # Add color if available
         if sensor_data.get("color"):
@@ -198,3 +223,38 @@ class HTTPAgentDeviceTracker(CoordinatorEntity, TrackerEntity):
     def available(self) -> bool:
         """Return True if entity is available."""
         return self.coordinator.last_update_success
+
+
+class HTTPAgentItemDeviceTracker(HTTPAgentDeviceTracker):
+    """HTTP Agent device tracker for one element of a fan-out tracker."""
+
+    def __init__(
+        self,
+        coordinator: HTTPAgentCoordinator,
+        entry: ConfigEntry,
+        sensor_name: str,
+        item_key: str,
+    ) -> None:
+        """Initialize the item device tracker."""
+        super().__init__(coordinator, entry, sensor_name)
+        self.item_key = item_key
+
+        # Entity properties
+        self._attr_name = f"{sensor_name} {item_key}"
+        self._attr_unique_id = item_unique_id(entry.entry_id, sensor_name, item_key)
+
+    @property
+    def sensor_data(self) -> dict[str, Any]:
+        """Return the values extracted for this element."""
+        sensor_data = (self.coordinator.data or {}).get(self.sensor_name, {})
+        return (sensor_data.get("items") or {}).get(self.item_key, {})
+
+    @property
+    def name(self) -> str:
+        """Return the name of the device tracker."""
+        return self._attr_name
+
+    @property
+    def available(self) -> bool:
+        """Return True if the element was present in the last response."""
+        return super().available and bool(self.sensor_data)
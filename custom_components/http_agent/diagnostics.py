@@ -0,0 +1,27 @@
+"""Diagnostics support for HTTP Agent."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_HEADERS, CONF_PAYLOAD, CONF_URL, DOMAIN
+
+# Request details that may contain credentials
+TO_REDACT = {CONF_URL, CONF_HEADERS, CONF_PAYLOAD}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    return {
+        "config": async_redact_data({**entry.data, **entry.options}, TO_REDACT),
+        "extraction_cache": coordinator.cache_stats,
+        "transfer": coordinator.transfer_stats,
+    }
@@ -0,0 +1,1055 @@
+"""Selector compilation and value extraction for HTTP Agent."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from functools import cached_property
+import hashlib
+from io import BytesIO
+import json
+import logging
+import re
+from typing import Any
+
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
+import soupsieve as sv
+
+from .const import (
+    CONF_SENSOR_ATTRIBUTES,
+    CONF_SENSOR_COLOR,
+    CONF_SENSOR_DEVICE_CLASS,
+    CONF_SENSOR_ICON,
+    CONF_SENSOR_ITEM_KEY,
+    CONF_SENSOR_ITEMS,
+    CONF_SENSOR_METHOD,
+    CONF_SENSOR_NAME,
+    CONF_SENSOR_STATE,
+    CONF_SENSOR_TYPE,
+    CONF_SENSOR_UNIT,
+    CONF_TRACKER_LATITUDE,
+    CONF_TRACKER_LOCATION_NAME,
+    CONF_TRACKER_LONGITUDE,
+    CONF_TRACKER_SOURCE_TYPE,
+    DEFAULT_SENSOR_METHOD,
+    FAN_OUT_SENSOR_TYPES,
+    XML_ITERPARSE_THRESHOLD,
+)
+from .decoders import (
+    JSON_DECODE_ERRORS,
+    binary_loads,
+    is_binary,
+    is_utf8,
+    json_loads,
+    json_loads_body,
+)
+from .jsonpath import JSONPath, JSONPathError
+from .metrics import Metrics, MetricSelector, compile_metric_selector, is_exposition
+from .regexscan import RegexScanner
+from .tabular import CellSelector, Table, compile_cell_selector
+
+_LOGGER = logging.getLogger(__name__)
+
+# Selector fields extracted for every sensor type
+SENSOR_FIELDS = {
+    "state": CONF_SENSOR_STATE,
+    "icon": CONF_SENSOR_ICON,
+    "color": CONF_SENSOR_COLOR,
+}
+
+# Additional selector fields extracted for device trackers
+TRACKER_FIELDS = {
+    "latitude": CONF_TRACKER_LATITUDE,
+    "longitude": CONF_TRACKER_LONGITUDE,
+    "location_name": CONF_TRACKER_LOCATION_NAME,
+}
+
+# Entries of an attribute mapping, separated by newlines or by semicolons
+# that are followed by the next attribute name
+_ATTRIBUTE_SEPARATOR = re.compile(r"\n|;(?=\s*[^\s:;][^:;]*:)")
+_ATTRIBUTE_ENTRY = re.compile(r"^\s*([^:]+?)\s*:\s*(.+?)\s*$")
+
+# Supported PCRE-style regex flags
+REGEX_FLAGS = {
+    "i": re.I,
+    "m": re.M,
+    "s": re.S,
+    "x": re.X,
+    "a": re.A,
+    "l": re.L,
+}
+
+# Marks a response attribute that has not been parsed yet
+NOT_PARSED = object()
+
+# Extraction method used for each kind of Content-Type
+_CONTENT_METHODS = (
+    (re.compile(r"^text/html$|^application/xhtml\+xml$"), "css"),
+    (re.compile(r"[/+]json$"), "json"),
+    (re.compile(r"[/+]xml$"), "xml"),
+    (re.compile(r"^text/(?:csv|tab-separated-values)$"), "csv"),
+)
+
+# Methods whose parser rejects bodies in other formats. The HTML parser
+# accepts anything, so mislabelled JSON served as text/html still falls back.
+# A CSV document only yields cells for selectors naming its header columns,
+# and a metrics exposition only samples for the metric names it contains.
+_STRICT_METHODS = {"json", "xml", "csv", "metrics"}
+
+# XML parser that never loads external entities or DTDs from the network
+_XML_PARSER = etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=True)
+
+# ElementTree style {namespace}tag names in XPath selectors
+_CLARK_NAME = re.compile(r"\{([^}]*)\}")
+
+# Element paths that can be resolved while streaming with iterparse
+_SIMPLE_XPATH = re.compile(
+    r"^(?P<absolute>/)?(?:\./)?(?P<steps>[\w.-]+(?:/[\w.-]+)*)"
+    r"(?:/(?:@(?P<attribute>[\w.-]+)|(?P<text>text\(\))))?$"
+)
+
+# Parts of the leftmost compound selector that a strainer can filter on
+_CSS_TAG = re.compile(r"[a-zA-Z][\w-]*")
+_CSS_ID = re.compile(r"#([\w-]+)")
+_CSS_CLASS = re.compile(r"\.([\w-]+)")
+
+
+class HTTPResponse:
+    """Custom response class for template access.
+
+    The body is only decoded, and parsed into JSON, HTML or XML, the first
+    time the corresponding attribute is accessed, and the result is memoized so a
+    refresh only pays for the parsers its sensors actually use.
+
+    A response prepared for a plan with `for_plan` takes the parsed forms that
+    do not depend on the plan from the response it was made from, so entries
+    sharing one fetched response parse it once.
+    """
+
+    def __init__(
+        self,
+        body: bytes,
+        status: int,
+        headers: dict,
+        encoding: str | None = None,
+        json_data: Any = NOT_PARSED,
+        soup_strainer: SoupStrainer | None = None,
+        xml_paths: dict[str, SimpleXPath] | None = None,
+        regex_scanner: RegexScanner | None = None,
+    ):
+        """Initialize the response.
+
+        `json_data` can be passed when the body has already been parsed as
+        JSON while it was being read. `soup_strainer` limits HTML parsing to
+        the parts of the document the CSS selectors can reach,
+        `xml_paths` allows large XML documents to be streamed and
+        `regex_scanner` finds all regex selectors in a single pass.
+        """
+        self.body = body
+        self.status = status
+        self.headers = headers
+        self.encoding = encoding or "utf-8"
+        self.soup_strainer = soup_strainer
+        self.xml_paths = xml_paths
+        self.regex_scanner = regex_scanner
+        self.parent: HTTPResponse | None = None
+
+        if json_data is not NOT_PARSED:
+            self.__dict__["json"] = json_data
+
+    def for_plan(
+        self,
+        soup_strainer: SoupStrainer | None = None,
+        xml_paths: dict[str, SimpleXPath] | None = None,
+        regex_scanner: RegexScanner | None = None,
+    ) -> HTTPResponse:
+        """Return this response with the parsing options of an extraction plan."""
+        response = HTTPResponse(
+            self.body,
+            self.status,
+            self.headers,
+            self.encoding,
+            soup_strainer=soup_strainer,
+            xml_paths=xml_paths,
+            regex_scanner=regex_scanner,
+        )
+        response.parent = self
+        return response
+
+    def header(self, name: str) -> str | None:
+        """Return the value of a response header, matching its name in any case."""
+        name = name.lower()
+        return next(
+            (value for key, value in self.headers.items() if key.lower() == name),
+            None,
+        )
+
+    @cached_property
+    def content_type(self) -> str:
+        """Return the Content-Type header, including its parameters."""
+        return self.header("Content-Type") or ""
+
+    @cached_property
+    def media_type(self) -> str:
+        """Return the lower-case media type of the Content-Type header."""
+        return self.content_type.split(";", 1)[0].strip().lower()
+
+    @cached_property
+    def content_method(self) -> str | None:
+        """Return the extraction method matching the response content type."""
+        if is_binary(self.media_type):
+            return "json"
+        if is_exposition(self.media_type, self.content_type):
+            return "metrics"
+        for pattern, method in _CONTENT_METHODS:
+            if pattern.search(self.media_type):
+                return method
+        return None
+
+    @cached_property
+    def text(self) -> str:
+        """Return the body decoded using the response charset."""
+        if self.parent is not None:
+            return self.parent.text
+        try:
+            return self.body.decode(self.encoding, errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+    @cached_property
+    def json(self) -> Any:
+        """Return the body parsed as JSON, or None if it is not JSON.
+
+        MessagePack and CBOR bodies are decoded into the same structure.
+        """
+        if self.parent is not None:
+            return self.parent.json
+        if (decode := binary_loads(self.media_type)) is not None:
+            try:
+                return decode(self.body)
+            except Exception as err:
+                _LOGGER.debug("Failed to decode %s body: %s", self.media_type, err)
+                return None
+
+        try:
+            if is_utf8(self.encoding):
+                # Skip decoding the body to a string
+                return json_loads_body(self.body)
+            return json_loads(self.text)
+        except JSON_DECODE_ERRORS:
+            return None
+
+    @cached_property
+    def soup(self) -> BeautifulSoup | None:
+        """Return the body parsed as HTML, or None if parsing failed."""
+        if self.parent is not None and self.soup_strainer is self.parent.soup_strainer:
+            return self.parent.soup
+        try:
+            return BeautifulSoup(self.text, "lxml", parse_only=self.soup_strainer)
+        except Exception:
+            return None
+
+    @cached_property
+    def regex_matches(self) -> dict[re.Pattern[str], re.Match[str] | None]:
+        """Return the first match of every pattern known to the scanner."""
+        if not self.regex_scanner:
+            return {}
+        return self.regex_scanner.scan(self.text)
+
+    @cached_property
+    def table(self) -> Table | None:
+        """Return the body parsed as CSV or TSV, or None if parsing failed."""
+        if self.parent is not None:
+            return self.parent.table
+        try:
+            return Table(self.text, self.media_type)
+        except Exception:
+            return None
+
+    @cached_property
+    def metrics(self) -> Metrics | None:
+        """Return the body parsed as a metrics exposition, or None if it failed."""
+        if self.parent is not None:
+            return self.parent.metrics
+        try:
+            return Metrics(self.text)
+        except Exception:
+            return None
+
+    @cached_property
+    def xml(self) -> etree._Element | StreamedXML | None:
+        """Return the body parsed as XML, or None if parsing failed.
+
+        Large documents are streamed with iterparse instead of being built
+        as a tree when every XPath selector of the plan is a simple path.
+        """
+        if self.parent is not None and self.xml_paths == self.parent.xml_paths:
+            return self.parent.xml
+        try:
+            if self.xml_paths and len(self.body) >= XML_ITERPARSE_THRESHOLD:
+                return StreamedXML(self.body, self.xml_paths)
+            return etree.fromstring(self.body, _XML_PARSER)
+        except Exception:
+            return None
+
+
+def _compile_json_path(
+    selector: str,
+) -> tuple[tuple[str, int | None], ...] | JSONPath | None:
+    """Compile a `$` JSONPath expression, or split a dotted path into tokens."""
+    if selector.startswith("$"):
+        try:
+            return JSONPath(selector)
+        except JSONPathError as err:
+            _LOGGER.debug("Selector '%s' is not a valid JSONPath: %s", selector, err)
+            return None
+
+    tokens = []
+    for part in selector.split("."):
+        try:
+            index = int(part)
+        except ValueError:
+            index = None
+        tokens.append((part, index))
+    return tuple(tokens)
+
+
+class SimpleXPath:
+    """A plain element path that can be matched while streaming."""
+
+    __slots__ = ("absolute", "steps", "attribute")
+
+    def __init__(self, absolute: bool, steps: list[str], attribute: str | None):
+        """Initialize the path."""
+        self.absolute = absolute
+        self.steps = tuple(steps)
+        self.attribute = attribute
+
+    def matches(self, path: list[str]) -> bool:
+        """Return True if the element path (root tag first) is this path."""
+        if self.absolute:
+            return tuple(path) == self.steps
+        return len(path) == len(self.steps) + 1 and tuple(path[1:]) == self.steps
+
+
+class CompiledXPath:
+    """An XPath 1.0 expression compiled with lxml."""
+
+    __slots__ = ("selector", "xpath", "simple")
+
+    def __init__(self, selector: str, xpath: etree.XPath, simple: SimpleXPath | None):
+        """Initialize the compiled expression."""
+        self.selector = selector
+        self.xpath = xpath
+        self.simple = simple
+
+
+def _compile_xpath(selector: str) -> CompiledXPath | None:
+    """Compile an XPath selector, or return None if it is not valid XPath."""
+    # Translate ElementTree {namespace}tag names into prefixed names
+    namespaces: dict[str, str] = {}
+
+    def _prefix(match: re.Match[str]) -> str:
+        prefix = namespaces.setdefault(match.group(1), f"ns{len(namespaces)}")
+        return f"{prefix}:"
+
+    expression = _CLARK_NAME.sub(_prefix, selector)
+    try:
+        xpath = etree.XPath(
+            expression,
+            namespaces={prefix: uri for uri, prefix in namespaces.items()},
+            smart_strings=False,
+        )
+    except etree.XPathError:
+        return None
+
+    simple = None
+    if not namespaces and (match := _SIMPLE_XPATH.match(selector)):
+        simple = SimpleXPath(
+            bool(match.group("absolute")),
+            match.group("steps").split("/"),
+            match.group("attribute"),
+        )
+
+    return CompiledXPath(selector, xpath, simple)
+
+
+class StreamedXML(dict):
+    """Values of simple XPath selectors, resolved with iterparse.
+
+    The document is never built as a whole: elements are cleared as soon as
+    they have been seen and parsing stops once every path has a value.
+    """
+
+    def __init__(self, body: bytes, paths: dict[str, SimpleXPath]) -> None:
+        """Stream the document and record the first match of every path."""
+        super().__init__()
+        pending = dict(paths)
+        tags: list[str] = []
+
+        for event, element in etree.iterparse(
+            BytesIO(body),
+            events=("start", "end"),
+            resolve_entities=False,
+            no_network=True,
+            huge_tree=True,
+        ):
+            if event == "start":
+                tags.append(element.tag)
+                for selector, path in list(pending.items()):
+                    if path.attribute and path.matches(tags):
+                        self[selector] = element.get(path.attribute)
+                        del pending[selector]
+                continue
+
+            for selector, path in list(pending.items()):
+                if not path.attribute and path.matches(tags):
+                    self[selector] = element.text
+                    del pending[selector]
+
+            tags.pop()
+            if not pending:
+                break
+
+            # Free everything that has been parsed so far
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+
+def _compile_css(selector: str) -> sv.SoupSieve | None:
+    """Compile a CSS selector, or return None if it is not valid CSS."""
+    try:
+        return sv.compile(selector)
+    except Exception:
+        return None
+
+
+def _compile_regex(selector: str) -> re.Pattern[str] | None:
+    """Compile a `/pattern/flags` selector, or return None if it is not one."""
+    last_slash = selector.rfind("/")
+    if not selector.startswith("/") or last_slash < 1:
+        return None
+
+    pattern = selector[1:last_slash]
+    re_flags = 0
+    for flag in selector[last_slash + 1 :]:
+        if flag.lower() not in REGEX_FLAGS:
+            return None
+        re_flags |= REGEX_FLAGS[flag.lower()]
+
+    try:
+        compiled = re.compile(pattern, re_flags)
+    except (re.error, ValueError) as err:
+        _LOGGER.debug("Invalid regular expression '%s': %s", selector, err)
+        return None
+
+    # Without a capture group the selector can never produce a value
+    return compiled if compiled.groups else None
+
+
+def parse_attribute_mapping(text: str | None) -> list[tuple[str, str]]:
+    """Parse `name: selector` entries of an attribute mapping.
+
+    The name `*` copies every member of the JSON object the selector
+    returns into the attributes.
+    """
+    entries = []
+    for line in _ATTRIBUTE_SEPARATOR.split(text or ""):
+        if match := _ATTRIBUTE_ENTRY.match(line):
+            entries.append((match.group(1), match.group(2)))
+        elif line.strip():
+            _LOGGER.warning("Ignoring invalid attribute mapping entry '%s'", line)
+    return entries
+
+
+def _split_css(selector: str) -> tuple[list[str], bool]:
+    """Split a selector list into its leftmost compound selectors.
+
+    Also returns whether any of the selectors continues with a sibling
+    combinator right after its leftmost compound.
+    """
+    compounds = []
+    sibling = False
+    depth = 0
+    quote = None
+    start = 0
+    compound_end = None
+
+    for pos, char in enumerate(selector + ","):
+        if quote:
+            if char == quote:
+                quote = None
+            continue
+        if char in "\"'":
+            quote = char
+        elif char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif depth:
+            continue
+        elif char == ",":
+            compounds.append(selector[start : compound_end or pos].strip())
+            start = pos + 1
+            compound_end = None
+        elif compound_end is None and pos > start and char in " \t\n>+~":
+            if selector[start:pos].strip():
+                compound_end = pos
+                rest = selector[pos:].lstrip()
+                sibling = sibling or rest[:1] in ("+", "~")
+
+    return compounds, sibling
+
+
+def _compile_soup_strainer(selectors: Iterable[str]) -> SoupStrainer | None:
+    """Build a strainer that keeps only the elements the selectors can reach.
+
+    A strainer is only possible when the leftmost compound of every selector
+    filters on something the parser can see while building the tree, and
+    when matching does not depend on the element's position among its
+    siblings. Elements matching a leftmost compound are kept together with
+    all their descendants, so the rest of the selector still matches.
+    """
+    parts: list[tuple[str | None, list[str], list[str]]] = []
+
+    for selector in selectors:
+        compounds, sibling = _split_css(selector)
+        if sibling:
+            return None
+        for compound in compounds:
+            if not compound or any(char in compound for char in ":\\|"):
+                return None
+            tag_match = _CSS_TAG.match(compound)
+            tag = tag_match.group().lower() if tag_match else None
+            # Ignore attribute selectors when looking for ids and classes
+            plain = re.sub(r"\[[^\]]*\]", "", compound)
+            parts.append((tag, _CSS_ID.findall(plain), _CSS_CLASS.findall(plain)))
+
+    if not parts:
+        return None
+
+    if all(tag for tag, _, _ in parts):
+        return SoupStrainer(name=sorted({tag for tag, _, _ in parts}))
+    if all(ids for _, ids, _ in parts):
+        return SoupStrainer(attrs={"id": sorted({ids[0] for _, ids, _ in parts})})
+    if all(classes for _, _, classes in parts):
+        return SoupStrainer(
+            attrs={"class": sorted({classes[0] for _, _, classes in parts})}
+        )
+
+    return None
+
+
+class CompiledSelector:
+    """A selector compiled once for every extraction method it is valid for."""
+
+    __slots__ = (
+        "selector",
+        "method",
+        "json_path",
+        "xpath",
+        "csv",
+        "metric",
+        "css",
+        "regex",
+        "methods",
+        "preferred",
+    )
+
+    def __init__(self, selector: str, method: str = DEFAULT_SENSOR_METHOD) -> None:
+        """Compile the selector for its pinned method, or for all of them."""
+        self.selector = selector
+        self.method = method
+        self.json_path = self.xpath = self.csv = self.metric = None
+        self.css = self.regex = None
+
+        if method in ("auto", "regex"):
+            self.regex = _compile_regex(selector)
+        # A /pattern/flags selector with capture groups is always a regex
+        if method == "auto" and self.regex is None:
+            self.json_path = _compile_json_path(selector)
+            self.xpath = _compile_xpath(selector)
+            self.csv = compile_cell_selector(selector)
+            self.metric = compile_metric_selector(selector)
+            self.css = _compile_css(selector)
+        elif method == "json":
+            self.json_path = _compile_json_path(selector)
+        elif method == "xml":
+            self.xpath = _compile_xpath(selector)
+        elif method == "csv":
+            self.csv = compile_cell_selector(selector)
+        elif method == "metrics":
+            self.metric = compile_metric_selector(selector)
+        elif method == "css":
+            self.css = _compile_css(selector)
+
+        # Extraction methods in order of preference. The response attribute is
+        # only looked up (and therefore parsed) when the method is reached;
+        # methods without one are handed the response itself.
+        self.methods = tuple(
+            (method_name, compiled, extract_func, attribute)
+            for method_name, compiled, extract_func, attribute in (
+                ("json", self.json_path, _extract_json_value, "json"),
+                ("xml", self.xpath, _extract_xml_value, "xml"),
+                ("csv", self.csv, _extract_csv_value, "table"),
+                ("metrics", self.metric, _extract_metric_value, "metrics"),
+                ("css", self.css, _extract_css_value, "soup"),
+                ("regex", self.regex, _extract_regex_value, None),
+            )
+            if compiled is not None
+        )
+        # The same methods with the one matching a content type moved first
+        self.preferred = {
+            method[0]: (method,) + tuple(m for m in self.methods if m is not method)
+            for method in self.methods
+        }
+        if not self.methods:
+            _LOGGER.warning(
+                "Selector '%s' is not valid for the %s extraction method",
+                selector,
+                method,
+            )
+
+    def extract(self, response: HTTPResponse) -> Any:
+        """Extract a value from the response.
+
+        The method matching the response content type is tried first, and
+        on its own when a JSON or XML body parses in that format. Otherwise
+        every method the selector is valid for is tried in turn.
+        """
+        preferred = response.content_method
+        methods = self.preferred.get(preferred, self.methods)
+
+        for method_name, compiled, extract_func, attribute in methods:
+            data = getattr(response, attribute) if attribute else response
+            if data is None:
+                continue
+
+            try:
+                result = extract_func(data, compiled)
+            except Exception as err:
+                _LOGGER.debug(
+                    "Failed to extract value using %s method with selector '%s': %s",
+                    method_name,
+                    self.selector,
+                    err,
+                )
+                result = None
+
+            if result is not None:
+                _LOGGER.debug(
+                    "Successfully extracted value using %s method with selector '%s': %s",
+                    method_name,
+                    self.selector,
+                    result,
+                )
+                return result
+
+            if method_name == preferred and preferred in _STRICT_METHODS:
+                # The body parsed in the format the server announced
+                break
+
+        _LOGGER.warning(
+            "Could not extract value with selector '%s' using any available method",
+            self.selector,
+        )
+        return None
+
+
+def _extract_json_value(
+    json_data: dict | list, path: tuple[tuple[str, int | None], ...] | JSONPath
+) -> Any:
+    """Extract value from JSON using a JSONPath or a tokenized dotted path."""
+    if not json_data:
+        return None
+
+    if isinstance(path, JSONPath):
+        return path.extract(json_data)
+
+    current = json_data
+    for key, index in path:
+        if isinstance(current, dict):
+            current = current.get(key)
+        elif isinstance(current, list):
+            if index is None:
+                return None
+            try:
+                current = current[index]
+            except IndexError:
+                return None
+        else:
+            return None
+
+        if current is None:
+            return None
+
+    return current
+
+
+def _extract_xml_value(
+    xml_data: etree._Element | StreamedXML, xpath: CompiledXPath
+) -> Any:
+    """Extract value from XML using a compiled XPath expression."""
+    if isinstance(xml_data, StreamedXML):
+        return xml_data.get(xpath.selector)
+
+    result = xpath.xpath(xml_data)
+
+    if isinstance(result, list):
+        if not result:
+            return None
+        result = result[0]
+        if isinstance(result, etree._Element):
+            return result.text
+        return str(result)
+
+    if isinstance(result, bool):
+        return result
+    if isinstance(result, float):
+        return int(result) if result.is_integer() else result
+
+    return result or None
+
+
+def _extract_csv_value(table: Table, cell: CellSelector) -> Any:
+    """Extract a cell value from a CSV or TSV document."""
+    return table.cell(cell)
+
+
+def _extract_metric_value(metrics: Metrics, selector: MetricSelector) -> Any:
+    """Extract a sample value from a Prometheus or OpenMetrics exposition."""
+    return metrics.value(selector)
+
+
+def _extract_css_value(soup: BeautifulSoup, selector: sv.SoupSieve) -> Any:
+    """Extract value from HTML using a compiled CSS selector."""
+    element = selector.select_one(soup)
+    if element:
+        return element.get_text(strip=True)
+    return None
+
+
+def _extract_regex_value(response: HTTPResponse, pattern: re.Pattern[str]) -> Any:
+    """Extract value from the response text using a compiled regular expression.
+
+    Patterns known to the plan's scanner were all searched in a single pass
+    the first time one of them was needed.
+    """
+    matches = response.regex_matches
+    if pattern in matches:
+        match = matches[pattern]
+    else:
+        match = pattern.search(response.text)
+
+    if match and match.lastindex is not None:
+        if match.lastindex == 1:
+            return match.group(1)
+        return "|".join(match.group(i) for i in range(1, match.lastindex + 1))
+    return None
+
+
+class SensorPlan:
+    """Compiled selectors and static values for a single sensor.
+
+    A fan-out sensor selects a JSON array (or object) and extracts its field
+    selectors relative to every element, keyed by the item key selector, the
+    member name or the array index.
+    """
+
+    __slots__ = (
+        "name",
+        "sensor_type",
+        "selectors",
+        "attributes",
+        "static",
+        "items",
+        "item_key",
+    )
+
+    def __init__(
+        self,
+        sensor_config: dict[str, Any],
+        compile_selector: Callable[[str | None, str], CompiledSelector | None],
+    ) -> None:
+        """Compile the selectors of a sensor configuration."""
+        self.name = sensor_config[CONF_SENSOR_NAME]
+        self.sensor_type = sensor_config.get(CONF_SENSOR_TYPE, "sensor")
+        method = sensor_config.get(CONF_SENSOR_METHOD) or DEFAULT_SENSOR_METHOD
+
+        fields = dict(SENSOR_FIELDS)
+        if self.sensor_type == "device_tracker":
+            fields.update(TRACKER_FIELDS)
+
+        self.items = None
+        self.item_key = None
+        if self.sensor_type in FAN_OUT_SENSOR_TYPES and sensor_config.get(
+            CONF_SENSOR_ITEMS
+        ):
+            # Elements are JSON values, so every selector is a JSON path
+            self.items = compile_selector(sensor_config[CONF_SENSOR_ITEMS], "json")
+            if item_key := sensor_config.get(CONF_SENSOR_ITEM_KEY):
+                self.item_key = self._compile_item_path(item_key)
+            # Invalid paths are left out, as if the field was not configured
+            self.selectors = {
+                key: path
+                for key, conf_key in fields.items()
+                if (selector := sensor_config.get(conf_key))
+                and (path := self._compile_item_path(selector)) is not None
+            }
+            self.attributes = [
+                (name, self._compile_item_path(selector))
+                for name, selector in parse_attribute_mapping(
+                    sensor_config.get(CONF_SENSOR_ATTRIBUTES)
+                )
+            ]
+        else:
+            self.selectors = {
+                key: compile_selector(sensor_config.get(conf_key), method)
+                for key, conf_key in fields.items()
+            }
+            # Copying an object only makes sense for JSON
+            self.attributes = [
+                (name, compile_selector(selector, "json" if name == "*" else method))
+                for name, selector in parse_attribute_mapping(
+                    sensor_config.get(CONF_SENSOR_ATTRIBUTES)
+                )
+            ]
+
+        self.static: dict[str, Any] = {
+            "device_class": sensor_config.get(CONF_SENSOR_DEVICE_CLASS, ""),
+            "unit": sensor_config.get(CONF_SENSOR_UNIT, ""),
+        }
+        if self.sensor_type == "device_tracker":
+            self.static["source_type"] = sensor_config.get(
+                CONF_TRACKER_SOURCE_TYPE, "gps"
+            )
+
+    def _compile_item_path(
+        self, selector: str
+    ) -> tuple[tuple[str, int | None], ...] | JSONPath | None:
+        """Compile a JSON path applied to each element, warning if it is invalid."""
+        path = _compile_json_path(selector)
+        if path is None:
+            _LOGGER.warning(
+                "Selector '%s' of sensor '%s' is not a valid JSON path",
+                selector,
+                self.name,
+            )
+        return path
+
+    def extract(self, response: HTTPResponse) -> dict[str, Any]:
+        """Extract the values of this sensor from a response."""
+        sensor_values: dict[str, Any] = {"type": self.sensor_type}
+        if self.items is not None:
+            sensor_values["items"] = self._extract_items(response)
+        else:
+            for key, selector in self.selectors.items():
+                sensor_values[key] = selector.extract(response) if selector else None
+            if self.attributes:
+                sensor_values["attributes"] = self._collect_attributes(
+                    (name, selector.extract(response) if selector else None)
+                    for name, selector in self.attributes
+                )
+        sensor_values.update(self.static)
+        return sensor_values
+
+    @staticmethod
+    def _collect_attributes(values: Iterable[tuple[str, Any]]) -> dict[str, Any]:
+        """Build the attributes from extracted mapping values."""
+        attributes: dict[str, Any] = {}
+        for name, value in values:
+            if name != "*":
+                attributes[name] = value
+            elif isinstance(value, dict):
+                attributes.update(value)
+        return attributes
+
+    def _find_elements(self, response: HTTPResponse) -> Any:
+        """Return the array or object holding the elements of the sensor.
+
+        The matches of an expression that can select several values, such as
+        a filter, are the elements themselves, also when only one matched.
+        Its leading member names must resolve, so an error payload is not
+        taken for an empty selection.
+        """
+        json_path = self.items.json_path
+        if not isinstance(json_path, JSONPath) or json_path.singular:
+            return self.items.extract(response)
+
+        data = response.json
+        container = data
+        for name in json_path.prefix:
+            container = container.get(name) if isinstance(container, dict) else None
+        if not isinstance(container, (dict, list)):
+            return None
+        return json_path.find(data)
+
+    def _extract_items(
+        self, response: HTTPResponse
+    ) -> dict[str, dict[str, Any]] | None:
+        """Extract the values of every element of a fan-out sensor.
+
+        Returns None when the items selector does not resolve to an array or
+        object, so a transient error payload does not remove every item.
+        """
+        elements = self._find_elements(response)
+        if isinstance(elements, dict):
+            pairs = elements.items()
+        elif isinstance(elements, list):
+            pairs = enumerate(elements)
+        else:
+            return None
+
+        items: dict[str, dict[str, Any]] = {}
+        for default_key, element in pairs:
+            key = default_key
+            if self.item_key is not None:
+                key = _extract_json_value(element, self.item_key)
+                if key is None:
+                    continue
+            key = str(key)
+            if key in items:
+                _LOGGER.debug("Duplicate item key '%s' in sensor '%s'", key, self.name)
+                continue
+
+            item = {
+                field: _extract_json_value(element, path)
+                for field, path in self.selectors.items()
+            }
+            if self.attributes:
+                item["attributes"] = self._collect_attributes(
+                    (name, _extract_json_value(element, path) if path else None)
+                    for name, path in self.attributes
+                )
+            item.update(self.static)
+            items[key] = item
+
+        return items
+
+
+class ExtractionPlan:
+    """All selectors of a config entry, compiled once when the entry is loaded."""
+
+    def __init__(
+        self, sensors_config: list[dict[str, Any]], html_strainer: bool = False
+    ) -> None:
+        """Compile the selectors of every configured sensor."""
+        self.sensors_config = sensors_config
+        self.options = {"html_strainer": html_strainer}
+        self.key = hashlib.sha1(
+            json.dumps(
+                [sensors_config, self.options], sort_keys=True, default=str
+            ).encode()
+        ).hexdigest()
+        self._selectors: dict[tuple[str, str], CompiledSelector] = {}
+        self.sensors = [
+            SensorPlan(sensor_config, self._compile_selector)
+            for sensor_config in sensors_config
+        ]
+
+        self.soup_strainer = None
+        if html_strainer:
+            self.soup_strainer = _compile_soup_strainer(
+                selector.selector
+                for selector in self._selectors.values()
+                if selector.css is not None
+            )
+            _LOGGER.debug("HTML strainer for CSS selectors: %s", self.soup_strainer)
+
+        # Every regex selector of the entry is searched in one pass
+        self.regex_scanner = RegexScanner(self.regex_patterns)
+
+        # Large XML documents can only be streamed if no selector needs the tree
+        xpaths = [
+            selector.xpath
+            for selector in self._selectors.values()
+            if selector.xpath is not None
+        ]
+        self.xml_paths = None
+        if xpaths and all(xpath.simple is not None for xpath in xpaths):
+            self.xml_paths = {xpath.selector: xpath.simple for xpath in xpaths}
+
+    @property
+    def json_paths(self) -> set[tuple[str, ...]]:
+        """Return the keys of every JSON path used by the plan.
+
+        JSONPath expressions contribute their leading member names; an empty
+        tuple means the whole document is needed.
+        """
+        return {
+            (
+                selector.json_path.prefix
+                if isinstance(selector.json_path, JSONPath)
+                else tuple(key for key, _ in selector.json_path)
+            )
+            for selector in self._selectors.values()
+            if selector.json_path is not None
+        }
+
+    @property
+    def regex_only(self) -> bool:
+        """Return True if every selector of the plan is a regular expression."""
+        return bool(self._selectors) and all(
+            selector.regex is not None and len(selector.methods) == 1
+            for selector in self._selectors.values()
+        )
+
+    @property
+    def regex_patterns(self) -> list[re.Pattern[str]]:
+        """Return the regular expressions of every selector."""
+        return [
+            selector.regex
+            for selector in self._selectors.values()
+            if selector.regex is not None
+        ]
+
+    def _compile_selector(
+        self, selector: str | None, method: str
+    ) -> CompiledSelector | None:
+        """Return the compiled selector, sharing it between identical selectors."""
+        if not selector:
+            return None
+        if (selector, method) not in self._selectors:
+            self._selectors[(selector, method)] = CompiledSelector(selector, method)
+        return self._selectors[(selector, method)]
+
+    def extract(self, response: HTTPResponse) -> dict[str, Any]:
+        """Extract the values of every sensor from a response."""
+        return {sensor.name: sensor.extract(response) for sensor in self.sensors}
+
+
+# Plans compiled inside an extraction worker process, keyed by plan key
+_WORKER_PLANS: dict[str, ExtractionPlan] = {}
+
+
+def extract_in_worker(
+    plan_key: str,
+    sensors_config: list[dict[str, Any]],
+    plan_options: dict[str, Any],
+    body: bytes,
+    status: int,
+    headers: dict,
+    encoding: str | None,
+) -> dict[str, Any]:
+    """Extract sensor data in a worker process.
+
+    Compiled selectors cannot cross the process boundary, so each worker
+    compiles the plan from the sensor configuration once and reuses it for
+    later responses. Only the extracted values are sent back.
+    """
+    plan = _WORKER_PLANS.get(plan_key)
+    if plan is None:
+        plan = _WORKER_PLANS[plan_key] = ExtractionPlan(sensors_config, **plan_options)
+
+    return plan.extract(
+        HTTPResponse(
+            body,
+            status,
+            headers,
+            encoding,
+            soup_strainer=plan.soup_strainer,
+            xml_paths=plan.xml_paths,
+            regex_scanner=plan.regex_scanner,
+        )
+    )
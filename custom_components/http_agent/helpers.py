@@ -1,11 +1,30 @@
 """Helper utilities for HTTP Agent entities."""
 
+from collections.abc import Callable
+import logging
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from .const import CONF_SENSOR_NAME, CONF_SENSOR_UNIT, CONF_SENSORS
 
+_LOGGER = logging.getLogger(__name__)
+
+# Separates the sensor name from the item key in item entity unique IDs. It
+# cannot occur in the `{entry_id}_{sensor_name}` IDs of regular entities
+# unless a sensor name contains it.
+ITEM_UNIQUE_ID_SEPARATOR = "#item#"
+
+
+def item_unique_id(entry_id: str, sensor_name: str, item_key: str) -> str:
+    """Return the unique ID of the entity of one fan-out item."""
+    return f"{entry_id}_{sensor_name}{ITEM_UNIQUE_ID_SEPARATOR}{item_key}"
+
 
 def get_sensor_config(entry: ConfigEntry, sensor_name: str) -> dict[str, Any] | None:
     """Return sensor config by name from merged entry data and options."""
@@ -22,3 +41,71 @@ def get_sensor_config(entry: ConfigEntry, sensor_name: str) -> dict[str, Any] |
             return config
 
     return None
+
+
+@callback
+def async_setup_fan_out(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinator: DataUpdateCoordinator,
+    domain: str,
+    sensor_name: str,
+    async_add_entities: AddEntitiesCallback,
+    entity_factory: Callable[[str], Entity],
+) -> None:
+    """Keep one entity per element of a fan-out sensor.
+
+    After every refresh the item keys are diffed against the entities that
+    exist: new keys get an entity, vanished keys have theirs removed.
+    """
+    entities: dict[str, Entity] = {}
+    unique_id_prefix = item_unique_id(entry.entry_id, sensor_name, "")
+    registry_cleaned = False
+
+    @callback
+    def _async_update_entities() -> None:
+        nonlocal registry_cleaned
+        if not coordinator.last_update_success or not coordinator.data:
+            return
+
+        # The items selector did not resolve, keep the entities as they are
+        items = coordinator.data.get(sensor_name, {}).get("items")
+        if items is None:
+            return
+
+        keys = items.keys()
+        entity_registry = er.async_get(hass)
+
+        if added := keys - entities.keys():
+            new_entities = {key: entity_factory(key) for key in added}
+            entities.update(new_entities)
+            async_add_entities(new_entities.values())
+
+        for key in entities.keys() - keys:
+            entity = entities.pop(key)
+            _LOGGER.info("Removing %s item entity: %s", sensor_name, entity.entity_id)
+            if entity.registry_entry:
+                entity_registry.async_remove(entity.entity_id)
+            else:
+                hass.async_create_task(entity.async_remove())
+
+        # Drop entities of elements that disappeared while the entry was unloaded
+        if not registry_cleaned:
+            registry_cleaned = True
+            for entity_entry in er.async_entries_for_config_entry(
+                entity_registry, entry.entry_id
+            ):
+                if (
+                    entity_entry.domain == domain
+                    and entity_entry.unique_id.startswith(unique_id_prefix)
+                    and entity_entry.unique_id[len(unique_id_prefix) :] not in keys
+                ):
+                    _LOGGER.info(
+                        "Removing obsolete %s item entity: %s",
+                        sensor_name,
+                        entity_entry.entity_id,
+                    )
+                    entity_registry.async_remove(entity_entry.entity_id)
+
+    _async_update_entities()
+    entry.async_on_unload(coordinator.async_add_listener(_async_update_entities))
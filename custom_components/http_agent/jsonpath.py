@@ -0,0 +1,484 @@
+"""Compiled JSONPath expressions for HTTP Agent.
+
+Selectors starting with `$` are JSONPath expressions. They are parsed once
+into a list of steps which are then applied to every response:
+
+    $.store.book[0].title          child names and array indexes
+    $.store.book[-1]               negative indexes count from the end
+    $.store.book[*].author         wildcards over objects and arrays
+    $.store.book[0:4:2]            slices
+    $.store.book['title','isbn']   unions of names or indexes
+    $..price                       recursive descent
+    $.devices[?(@.id == 'x')].temperature
+                                   filters with ==, !=, <, <=, >, >=,
+                                   =~ /regex/flags, &&, || and !
+
+A single match returns the value itself, several matches return a list.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+import re
+from typing import Any
+
+Step = Callable[[list[Any], Any], list[Any]]
+Predicate = Callable[[Any, Any], bool]
+
+# Returned by relative paths in filters that do not match anything
+_MISSING = object()
+
+_NAME = re.compile(r"[^\s.\[\]()'\"=!<>&|,]+")
+_SLICE = re.compile(r"^\s*(-?\d+)?\s*:\s*(-?\d+)?\s*(?::\s*(-?\d+)?\s*)?$")
+_UNION_ITEM = re.compile(
+    r"\s*(?:'((?:[^'\\]|\\.)*)'|\"((?:[^\"\\]|\\.)*)\"|(-?\d+))\s*"
+)
+
+_FILTER_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<path>[@$](?:\.[\w-]+|\.\*|\[(?:'[^']*'|"[^"]*"|-?\d+|\*)\])*)
+        |(?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+        |(?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+        |(?P<regex>/(?:[^/\\]|\\.)*/[imsx]*)
+        |(?P<literal>true|false|null)\b
+        |(?P<operator>==|!=|<=|>=|=~|&&|\|\||[<>!()])
+    )""",
+    re.X,
+)
+_COMPARISONS: dict[str, Callable[[Any, Any], bool]] = {
+    "==": lambda left, right: left == right,
+    "!=": lambda left, right: left != right,
+    "<": lambda left, right: left < right,
+    "<=": lambda left, right: left <= right,
+    ">": lambda left, right: left > right,
+    ">=": lambda left, right: left >= right,
+}
+_LITERALS = {"true": True, "false": False, "null": None}
+_REGEX_FLAGS = {"i": re.I, "m": re.M, "s": re.S, "x": re.X}
+
+
+class JSONPathError(ValueError):
+    """Raised when a JSONPath expression cannot be parsed."""
+
+
+def _unescape(value: str) -> str:
+    """Resolve backslash escapes in a quoted name."""
+    return re.sub(r"\\(.)", r"\1", value)
+
+
+def _quoted_name(match: re.Match[str]) -> str:
+    """Return the raw name of a single or double quoted union item."""
+    return match.group(1) if match.group(1) is not None else match.group(2)
+
+
+def _children(node: Any) -> Iterator[Any]:
+    """Iterate over the values of an object or the items of an array."""
+    if isinstance(node, dict):
+        yield from node.values()
+    elif isinstance(node, list):
+        yield from node
+
+
+def _descendants(node: Any) -> Iterator[Any]:
+    """Iterate over a node and everything below it in document order."""
+    yield node
+    for child in _children(node):
+        yield from _descendants(child)
+
+
+def _name_step(name: str) -> Step:
+    """Select an object member."""
+
+    def step(nodes: list[Any], root: Any) -> list[Any]:
+        return [node[name] for node in nodes if isinstance(node, dict) and name in node]
+
+    return step
+
+
+def _index_step(index: int) -> Step:
+    """Select an array item."""
+
+    def step(nodes: list[Any], root: Any) -> list[Any]:
+        return [
+            node[index]
+            for node in nodes
+            if isinstance(node, list) and -len(node) <= index < len(node)
+        ]
+
+    return step
+
+
+def _union_step(steps: list[Step]) -> Step:
+    """Select the results of several names or indexes."""
+
+    def step(nodes: list[Any], root: Any) -> list[Any]:
+        result: list[Any] = []
+        for node in nodes:
+            for selector in steps:
+                result.extend(selector([node], root))
+        return result
+
+    return step
+
+
+def _slice_step(start: int | None, stop: int | None, stride: int | None) -> Step:
+    """Select a slice of an array."""
+    if stride == 0:
+        raise JSONPathError("Slice step cannot be zero")
+    selection = slice(start, stop, stride)
+
+    def step(nodes: list[Any], root: Any) -> list[Any]:
+        result: list[Any] = []
+        for node in nodes:
+            if isinstance(node, list):
+                result.extend(node[selection])
+        return result
+
+    return step
+
+
+def _wildcard_step(nodes: list[Any], root: Any) -> list[Any]:
+    """Select every member of an object or item of an array."""
+    result: list[Any] = []
+    for node in nodes:
+        result.extend(_children(node))
+    return result
+
+
+def _filter_step(predicate: Predicate) -> Step:
+    """Select the members or items for which a filter expression holds."""
+
+    def step(nodes: list[Any], root: Any) -> list[Any]:
+        return [
+            child
+            for node in nodes
+            for child in _children(node)
+            if predicate(child, root)
+        ]
+
+    return step
+
+
+def _descent_step(selector: Step) -> Step:
+    """Apply a selector to a node and all of its descendants."""
+
+    def step(nodes: list[Any], root: Any) -> list[Any]:
+        result: list[Any] = []
+        for node in nodes:
+            for descendant in _descendants(node):
+                result.extend(selector([descendant], root))
+        return result
+
+    return step
+
+
+class _FilterParser:
+    """Recursive descent parser for filter expressions."""
+
+    def __init__(self, expression: str) -> None:
+        """Tokenize the expression."""
+        self.tokens: list[tuple[str, str]] = []
+        pos = 0
+        expression = expression.rstrip()
+        while pos < len(expression):
+            match = _FILTER_TOKEN.match(expression, pos)
+            if match is None or match.end() == pos:
+                raise JSONPathError(f"Invalid filter expression: {expression!r}")
+            self.tokens.append((match.lastgroup, match.group(match.lastgroup)))
+            pos = match.end()
+        self.pos = 0
+
+    def parse(self) -> Predicate:
+        """Parse the whole expression."""
+        predicate = self._or()
+        if self.pos != len(self.tokens):
+            raise JSONPathError(f"Unexpected token {self.tokens[self.pos][1]!r}")
+        return predicate
+
+    def _peek(self) -> str | None:
+        """Return the next operator token, if the next token is an operator."""
+        if self.pos < len(self.tokens) and self.tokens[self.pos][0] == "operator":
+            return self.tokens[self.pos][1]
+        return None
+
+    def _next(self) -> tuple[str, str]:
+        """Consume the next token."""
+        if self.pos >= len(self.tokens):
+            raise JSONPathError("Unexpected end of filter expression")
+        self.pos += 1
+        return self.tokens[self.pos - 1]
+
+    def _or(self) -> Predicate:
+        """Parse `a || b`."""
+        terms = [self._and()]
+        while self._peek() == "||":
+            self.pos += 1
+            terms.append(self._and())
+        if len(terms) == 1:
+            return terms[0]
+        return lambda node, root: any(term(node, root) for term in terms)
+
+    def _and(self) -> Predicate:
+        """Parse `a && b`."""
+        terms = [self._unary()]
+        while self._peek() == "&&":
+            self.pos += 1
+            terms.append(self._unary())
+        if len(terms) == 1:
+            return terms[0]
+        return lambda node, root: all(term(node, root) for term in terms)
+
+    def _unary(self) -> Predicate:
+        """Parse `!a`, `(a)` or a comparison."""
+        operator = self._peek()
+        if operator == "!":
+            self.pos += 1
+            term = self._unary()
+            return lambda node, root: not term(node, root)
+        if operator == "(":
+            self.pos += 1
+            term = self._or()
+            if self._next() != ("operator", ")"):
+                raise JSONPathError("Missing ) in filter expression")
+            return term
+        return self._comparison()
+
+    def _comparison(self) -> Predicate:
+        """Parse `left op right`, or an existence test of a single operand."""
+        left = self._operand()
+        operator = self._peek()
+
+        if operator == "=~":
+            self.pos += 1
+            kind, value = self._next()
+            if kind != "regex":
+                raise JSONPathError("=~ must be followed by /pattern/flags")
+            pattern, _, flag_chars = value[1:].rpartition("/")
+            flags = 0
+            for flag in flag_chars:
+                flags |= _REGEX_FLAGS[flag]
+            try:
+                regex = re.compile(pattern, flags)
+            except re.error as err:
+                raise JSONPathError(
+                    f"Invalid regular expression {value}: {err}"
+                ) from err
+
+            def matches(node: Any, root: Any) -> bool:
+                value = left(node, root)
+                return isinstance(value, str) and regex.search(value) is not None
+
+            return matches
+
+        if operator in _COMPARISONS:
+            self.pos += 1
+            right = self._operand()
+            compare = _COMPARISONS[operator]
+
+            def compares(node: Any, root: Any) -> bool:
+                left_value = left(node, root)
+                right_value = right(node, root)
+                if left_value is _MISSING or right_value is _MISSING:
+                    return operator == "!=" and left_value is not right_value
+                try:
+                    return bool(compare(left_value, right_value))
+                except TypeError:
+                    return False
+
+            return compares
+
+        return lambda node, root: left(node, root) is not _MISSING
+
+    def _operand(self) -> Callable[[Any, Any], Any]:
+        """Parse a path or a literal."""
+        kind, value = self._next()
+
+        if kind == "path":
+            path = JSONPath("$" + value[1:])
+            relative = value[0] == "@"
+
+            def resolve(node: Any, root: Any) -> Any:
+                matches = path.find(node if relative else root)
+                return matches[0] if matches else _MISSING
+
+            return resolve
+
+        if kind == "string":
+            literal: Any = _unescape(value[1:-1])
+        elif kind == "number":
+            literal = float(value) if any(c in value for c in ".eE") else int(value)
+        elif kind == "literal":
+            literal = _LITERALS[value]
+        else:
+            raise JSONPathError(f"Unexpected token {value!r} in filter expression")
+
+        return lambda node, root: literal
+
+
+def _filter_refers_to_root(selector: str) -> bool:
+    """Return True if a bracketed selector is a filter using a `$` path."""
+    content = selector[1:-1].strip()
+    if not content.startswith("?"):
+        return False
+    return any(
+        kind == "path" and value[0] == "$"
+        for kind, value in _FilterParser(content[1:].strip()).tokens
+    )
+
+
+class JSONPath:
+    """A JSONPath expression compiled into a list of steps."""
+
+    __slots__ = ("expression", "steps", "prefix", "singular")
+
+    def __init__(self, expression: str) -> None:
+        """Parse the expression."""
+        self.expression = expression
+        self.steps: list[Step] = []
+
+        # Leading object member names, used to limit streaming JSON parsing
+        self.prefix: tuple[str, ...] = ()
+        in_prefix = True
+        refers_to_root = False
+
+        # Whether the expression can only select one value: member names and
+        # array indexes, without wildcards, slices, unions, filters or descent
+        self.singular = True
+
+        expression = expression.strip()
+        if not expression.startswith("$"):
+            raise JSONPathError("JSONPath must start with $")
+
+        pos = 1
+        while pos < len(expression):
+            if expression.startswith("..", pos):
+                pos += 2
+                if expression.startswith("[", pos):
+                    start = pos
+                    selector, pos = self._parse_bracket(expression, pos)
+                    refers_to_root |= _filter_refers_to_root(expression[start:pos])
+                else:
+                    selector, pos = self._parse_member(expression, pos)
+                self.steps.append(_descent_step(selector))
+                in_prefix = False
+                self.singular = False
+            elif expression.startswith(".", pos):
+                name = _NAME.match(expression, pos + 1)
+                selector, pos = self._parse_member(expression, pos + 1)
+                if in_prefix and name and name.group() != "*":
+                    self.prefix += (name.group(),)
+                else:
+                    in_prefix = False
+                if name is None or name.group() == "*":
+                    self.singular = False
+                self.steps.append(selector)
+            elif expression.startswith("[", pos):
+                start = pos
+                selector, pos = self._parse_bracket(expression, pos)
+                refers_to_root |= _filter_refers_to_root(expression[start:pos])
+                quoted = _UNION_ITEM.fullmatch(expression, start + 1, pos - 1)
+                if in_prefix and quoted and quoted.group(3) is None:
+                    self.prefix += (_unescape(_quoted_name(quoted)),)
+                else:
+                    in_prefix = False
+                if quoted is None:
+                    self.singular = False
+                self.steps.append(selector)
+            else:
+                raise JSONPathError(
+                    f"Unexpected character {expression[pos]!r} at {pos} in {expression!r}"
+                )
+
+        # A filter comparing with other parts of the document needs all of it
+        if refers_to_root:
+            self.prefix = ()
+
+    @staticmethod
+    def _parse_member(expression: str, pos: int) -> tuple[Step, int]:
+        """Parse a dotted member name or wildcard."""
+        if expression.startswith("*", pos):
+            return _wildcard_step, pos + 1
+        match = _NAME.match(expression, pos)
+        if match is None:
+            raise JSONPathError(f"Expected a member name at {pos} in {expression!r}")
+        return _name_step(match.group()), match.end()
+
+    @staticmethod
+    def _parse_bracket(expression: str, pos: int) -> tuple[Step, int]:
+        """Parse a bracketed selector starting at `[`."""
+        # Find the closing bracket, skipping quoted strings and nested brackets
+        depth = 0
+        quote = None
+        end = pos
+        while end < len(expression):
+            char = expression[end]
+            if quote:
+                if char == "\\":
+                    end += 1
+                elif char == quote:
+                    quote = None
+            elif char in "'\"":
+                quote = char
+            elif char == "[":
+                depth += 1
+            elif char == "]":
+                depth -= 1
+                if depth == 0:
+                    break
+            end += 1
+        else:
+            raise JSONPathError(f"Missing ] in {expression!r}")
+
+        content = expression[pos + 1 : end].strip()
+        end += 1
+
+        if content == "*":
+            return _wildcard_step, end
+
+        if content.startswith("?"):
+            content = content[1:].strip()
+            return _filter_step(_FilterParser(content).parse()), end
+
+        if slice_match := _SLICE.match(content):
+            start, stop, stride = (
+                int(value) if value is not None else None
+                for value in slice_match.groups()
+            )
+            return _slice_step(start, stop, stride), end
+
+        steps: list[Step] = []
+        item_pos = 0
+        while True:
+            item = _UNION_ITEM.match(content, item_pos)
+            if item is None:
+                raise JSONPathError(f"Invalid selector [{content}] in {expression!r}")
+            if item.group(3) is not None:
+                steps.append(_index_step(int(item.group(3))))
+            else:
+                steps.append(_name_step(_unescape(_quoted_name(item))))
+            item_pos = item.end()
+            if item_pos == len(content):
+                break
+            if content[item_pos] != ",":
+                raise JSONPathError(f"Invalid selector [{content}] in {expression!r}")
+            item_pos += 1
+
+        return (steps[0] if len(steps) == 1 else _union_step(steps)), end
+
+    def find(self, data: Any) -> list[Any]:
+        """Return every value matched by the expression."""
+        nodes = [data]
+        for step in self.steps:
+            nodes = step(nodes, data)
+            if not nodes:
+                break
+        return nodes
+
+    def extract(self, data: Any) -> Any:
+        """Return the single match, a list of matches, or None."""
+        matches = self.find(data)
+        if not matches:
+            return None
+        if len(matches) == 1:
+            return matches[0]
+        return matches
@@ -0,0 +1,309 @@
+"""Incremental JSON extraction for HTTP Agent.
+
+The streaming extractor is fed the response body chunk by chunk and walks the
+document without building it. Only the subtrees addressed by the configured
+dotted paths are decoded; everything else is skipped. Once every path has
+been resolved (or can no longer be), the caller can stop reading the body.
+
+The result is a sparse copy of the document that the regular JSON path
+extraction can walk unchanged. Arrays are represented by dicts keyed by the
+string form of their indexes, which `_extract_json_value` handles like
+object keys.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+import re
+
+from .decoders import json_loads
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = re.compile(r'"((?:[^"\\]|\\.)*)"', re.S)
+_STRING_BODY = re.compile(r'(?:[^"\\]|\\.)*', re.S)
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_LITERAL = re.compile(r"[^,\]}\s]*")
+
+# Frame states
+_KEY_OR_END = 0
+_COLON = 1
+_VALUE = 2
+_COMMA_OR_END = 3
+
+
+class _NeedMore(Exception):
+    """Raised when the buffer ends in the middle of a token."""
+
+
+class _PathNode:
+    """Node of the trie built from the configured paths."""
+
+    __slots__ = ("children", "terminal", "resolved")
+
+    def __init__(self) -> None:
+        """Initialize the node."""
+        self.children: dict[str, _PathNode] = {}
+        self.terminal = False
+        self.resolved = False
+
+
+class _Frame:
+    """An object or array currently being walked."""
+
+    __slots__ = ("is_object", "node", "target", "state", "key", "index")
+
+    def __init__(self, is_object: bool, node: _PathNode, target: dict) -> None:
+        """Initialize the frame."""
+        self.is_object = is_object
+        self.node = node
+        self.target = target
+        self.state = _KEY_OR_END if is_object else _VALUE
+        self.key: str | None = None
+        self.index = 0
+
+
+class StreamingJSONExtractor:
+    """Extract the subtrees addressed by dotted paths from a JSON stream."""
+
+    def __init__(self, paths: Iterable[tuple[str, ...]]) -> None:
+        """Build the path trie."""
+        self._root = _PathNode()
+        self._pending = 0
+        for path in paths:
+            node = self._root
+            for key in path:
+                node = node.children.setdefault(key, _PathNode())
+            if not node.terminal:
+                node.terminal = True
+                self._pending += 1
+
+        self.result: dict | None = {}
+        self.done = self._pending == 0
+
+        self._buf = ""
+        self._pos = 0
+        self._stack: list[_Frame] = []
+        self._started = False
+
+        # State of the value currently being skipped or captured
+        self._skipping = False
+        self._skip_depth = 0
+        self._skip_in_string = False
+        self._capture: tuple[dict, str, _PathNode, int] | None = None
+
+    def feed(self, data: str) -> bool:
+        """Consume the next chunk of the document, returning True when done."""
+        if self.done:
+            return True
+
+        self._buf += data
+        try:
+            self._parse()
+        except _NeedMore:
+            pass
+        except ValueError:
+            self.result = None
+            self.done = True
+
+        # Drop everything that has been consumed and is not being captured
+        keep_from = self._capture[3] if self._capture else self._pos
+        if keep_from:
+            self._buf = self._buf[keep_from:]
+            self._pos -= keep_from
+            if self._capture:
+                target, key, node, _ = self._capture
+                self._capture = (target, key, node, 0)
+
+        return self.done
+
+    def close(self) -> None:
+        """Signal the end of the document."""
+        if not self.done and (self._stack or not self._started):
+            # Truncated or empty document
+            self.result = None
+        self.done = True
+
+    def _parse(self) -> None:
+        """Advance through the buffer until it is exhausted or all paths resolve."""
+        while not self.done:
+            if self._skipping:
+                if not self._skip():
+                    raise _NeedMore
+                self._finish_skip()
+                continue
+
+            if not self._started:
+                char = self._peek()
+                if char not in "{[":
+                    raise ValueError("JSON document is not an object or array")
+                self._pos += 1
+                self._started = True
+                self._stack.append(_Frame(char == "{", self._root, self.result))
+                continue
+
+            if not self._stack:
+                self.done = True
+                return
+
+            self._step(self._stack[-1])
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it."""
+        self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+        if self._pos >= len(self._buf):
+            raise _NeedMore
+        return self._buf[self._pos]
+
+    def _step(self, frame: _Frame) -> None:
+        """Consume one token of the innermost object or array."""
+        char = self._peek()
+
+        if frame.state == _COMMA_OR_END:
+            if char == ",":
+                self._pos += 1
+                frame.state = _KEY_OR_END if frame.is_object else _VALUE
+                return
+            if char != ("}" if frame.is_object else "]"):
+                raise ValueError(f"Unexpected character {char!r}")
+            self._close_frame()
+            return
+
+        if frame.state == _KEY_OR_END:
+            if char == "}":
+                self._close_frame()
+                return
+            match = _STRING.match(self._buf, self._pos)
+            if match is None:
+                if char != '"':
+                    raise ValueError(f"Unexpected character {char!r}")
+                raise _NeedMore
+            raw_key = match.group(1)
+            frame.key = json_loads(match.group(0)) if "\\" in raw_key else raw_key
+            self._pos = match.end()
+            frame.state = _COLON
+            return
+
+        if frame.state == _COLON:
+            if char != ":":
+                raise ValueError(f"Unexpected character {char!r}")
+            self._pos += 1
+            frame.state = _VALUE
+            return
+
+        # Expecting a value
+        if not frame.is_object:
+            if char == "]" and frame.index == 0:
+                self._close_frame()
+                return
+            frame.key = str(frame.index)
+            frame.index += 1
+
+        frame.state = _COMMA_OR_END
+        self._start_value(frame, char)
+
+    def _start_value(self, frame: _Frame, char: str) -> None:
+        """Descend into, capture or skip the value at the current position."""
+        node = frame.node.children.get(frame.key)
+
+        if node is not None and node.resolved:
+            node = None
+
+        if node is not None and not node.terminal and char in "{[":
+            self._pos += 1
+            child: dict = {}
+            frame.target[frame.key] = child
+            self._stack.append(_Frame(char == "{", node, child))
+            return
+
+        if node is not None and node.terminal:
+            self._capture = (frame.target, frame.key, node, self._pos)
+
+        self._skipping = True
+        self._skip_depth = 0
+        self._skip_in_string = False
+
+    def _skip(self) -> bool:
+        """Scan past the current value, returning False if the buffer ran out."""
+        buf = self._buf
+        pos = self._pos
+
+        if self._skip_depth == 0 and not self._skip_in_string:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos >= len(buf):
+                self._pos = pos
+                return False
+            char = buf[pos]
+            if char not in '"[{':
+                # Number, true, false or null
+                end = _LITERAL.match(buf, pos).end()
+                if end >= len(buf):
+                    self._pos = pos
+                    return False
+                self._pos = end
+                return True
+
+        while True:
+            if self._skip_in_string:
+                pos = _STRING_BODY.match(buf, pos).end()
+                if pos >= len(buf) or buf[pos] != '"':
+                    self._pos = pos
+                    return False
+                pos += 1
+                self._skip_in_string = False
+                if self._skip_depth == 0:
+                    self._pos = pos
+                    return True
+                continue
+
+            match = _STRUCTURE.search(buf, pos)
+            if match is None:
+                self._pos = len(buf)
+                return False
+
+            char = match.group()
+            pos = match.end()
+            if char == '"':
+                self._skip_in_string = True
+            elif char in "[{":
+                self._skip_depth += 1
+            else:
+                self._skip_depth -= 1
+                if self._skip_depth == 0:
+                    self._pos = pos
+                    return True
+
+    def _finish_skip(self) -> None:
+        """Store a captured value once it has been scanned completely."""
+        self._skipping = False
+        if self._capture is None:
+            return
+
+        target, key, node, start = self._capture
+        self._capture = None
+        target[key] = json_loads(self._buf[start : self._pos])
+        self._resolve(node)
+        self._resolve_missing(node)
+
+    def _close_frame(self) -> None:
+        """Leave the innermost object or array."""
+        self._pos += 1
+        frame = self._stack.pop()
+
+        # Paths below this container that were not found cannot resolve anymore
+        self._resolve_missing(frame.node)
+
+    def _resolve(self, node: _PathNode) -> None:
+        """Mark a terminal path node as resolved."""
+        if node.terminal and not node.resolved:
+            node.resolved = True
+            self._pending -= 1
+            if self._pending == 0:
+                self.done = True
+
+    def _resolve_missing(self, node: _PathNode) -> None:
+        """Mark every unresolved terminal below a node as resolved."""
+        for child in node.children.values():
+            if child.resolved:
+                continue
+            self._resolve(child)
+            self._resolve_missing(child)
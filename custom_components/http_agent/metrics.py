@@ -0,0 +1,130 @@
+"""Prometheus and OpenMetrics extraction for HTTP Agent.
+
+The exposition format is parsed once per response into an index of metric
+name to label set to value. Selectors use the PromQL instant vector syntax
+without operators:
+
+    node_load1                                the sample without labels
+    http_requests_total{code="500"}           the sample with these labels
+    http_requests_total{code="500",method="get"}
+
+A selector whose labels match a series exactly is a single dictionary
+lookup. Otherwise the first series of that metric carrying all the selector
+labels is used, and the result is remembered for the rest of the response.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+
+# Media type of OpenMetrics; the Prometheus text format is text/plain with a
+# version parameter
+OPENMETRICS_MEDIA_TYPE = "application/openmetrics-text"
+_PROMETHEUS_VERSION = re.compile(r";\s*version\s*=\s*0\.0\.4\b")
+
+_METRIC_NAME = r"[a-zA-Z_:][a-zA-Z0-9_:]*"
+_LABEL_SET = r'\{((?:[^"}]|"(?:[^"\\]|\\.)*")*)\}'
+
+# name, optional label set and value of a sample line. Timestamps and
+# OpenMetrics exemplars after the value are ignored.
+_SAMPLE = re.compile(rf"^({_METRIC_NAME})\s*(?:{_LABEL_SET})?\s+(\S+)")
+_LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*"((?:[^"\\]|\\.)*)"')
+_SELECTOR = re.compile(rf"^({_METRIC_NAME})\s*(?:{_LABEL_SET})?$")
+_ESCAPE = re.compile(r"\\(.)")
+_ESCAPES = {"n": "\n"}
+
+Labels = frozenset[tuple[str, str]]
+
+
+def is_exposition(media_type: str, content_type: str) -> bool:
+    """Return True if the Content-Type announces a metrics exposition."""
+    if media_type == OPENMETRICS_MEDIA_TYPE:
+        return True
+    return media_type == "text/plain" and bool(_PROMETHEUS_VERSION.search(content_type))
+
+
+def _unescape(value: str) -> str:
+    """Resolve the escape sequences of a label value."""
+    if "\\" not in value:
+        return value
+    return _ESCAPE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), value)
+
+
+def _parse_labels(text: str | None) -> Labels:
+    """Parse the inside of a label set."""
+    if not text:
+        return frozenset()
+    return frozenset((name, _unescape(value)) for name, value in _LABEL.findall(text))
+
+
+def _parse_value(text: str) -> float | int | None:
+    """Parse a sample value, returning integral values as int."""
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    if math.isfinite(value) and value.is_integer():
+        return int(value)
+    return value
+
+
+class MetricSelector:
+    """A compiled `name{label="value",...}` selector."""
+
+    __slots__ = ("name", "labels")
+
+    def __init__(self, name: str, labels: Labels) -> None:
+        """Initialize the selector."""
+        self.name = name
+        self.labels = labels
+
+
+def compile_metric_selector(selector: str) -> MetricSelector | None:
+    """Compile a metric selector, or return None if the selector is not one."""
+    match = _SELECTOR.match(selector.strip())
+    if match is None:
+        return None
+    return MetricSelector(match.group(1), _parse_labels(match.group(2)))
+
+
+class Metrics:
+    """Samples of a Prometheus or OpenMetrics exposition, indexed by name."""
+
+    __slots__ = ("series", "_matches")
+
+    def __init__(self, text: str) -> None:
+        """Parse every sample line of the exposition."""
+        self.series: dict[str, dict[Labels, float | int | None]] = {}
+        self._matches: dict[tuple[str, Labels], float | int | None] = {}
+
+        for line in text.splitlines():
+            if not line or line[0] == "#":
+                continue
+            match = _SAMPLE.match(line)
+            if match is None:
+                continue
+            name, labels, value = match.groups()
+            self.series.setdefault(name, {}).setdefault(
+                _parse_labels(labels), _parse_value(value)
+            )
+
+    def value(self, selector: MetricSelector) -> float | int | None:
+        """Return the value of the selected sample, or None if there is none."""
+        series = self.series.get(selector.name)
+        if series is None:
+            return None
+        if selector.labels in series:
+            return series[selector.labels]
+
+        key = (selector.name, selector.labels)
+        if key not in self._matches:
+            self._matches[key] = next(
+                (
+                    value
+                    for labels, value in series.items()
+                    if selector.labels <= labels
+                ),
+                None,
+            )
+        return self._matches[key]
@@ -134,7 +134,8 @@ class HTTPAgentNumber(CoordinatorEntity, NumberEntity):
             return {}
 
         sensor_data = self.coordinator.data.get(self.sensor_name, {})
-        attributes = {}
+        # Attributes from the sensor's attribute mapping
+        attributes = dict(sensor_data.get("attributes") or {})
 
         # Add color if available
         if sensor_data.get("color"):
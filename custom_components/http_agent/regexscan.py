@@ -0,0 +1,263 @@
+"""Single-pass scanning for the regular expression selectors of an entry.
+
+All regex selectors are merged into one alternation that is only used to
+find the next position where any of them matches. At that position every
+pattern still looking for its first match is tried with `match`, which gives
+exactly the result `search` would have returned for it. The scan then
+continues after that position with the remaining patterns, so the text is
+walked once instead of once per selector.
+
+While a body is downloaded, RegexWatcher tells when every pattern has
+matched in the complete lines received so far, so the rest of the response
+does not have to be read.
+"""
+
+from __future__ import annotations
+
+import codecs
+from collections.abc import Iterable
+from functools import lru_cache
+import logging
+import re
+from re import _constants, _parser
+
+_LOGGER = logging.getLogger(__name__)
+
+# Flags that can be scoped to a part of a pattern with (?imsx:...)
+_SCOPED_FLAGS = {re.I: "i", re.M: "m", re.S: "s", re.X: "x"}
+
+# Constructs whose meaning depends on the group numbering or on the position
+# in the pattern: backreferences, named groups, conditionals and global flags
+_NOT_COMBINABLE = re.compile(
+    r"(?<!\\)(?:\\\\)*\\(?:[1-9]|g<)|\(\?P|\(\?\(|\(\?<[a-zA-Z_]|\(\?[aiLmsux]+\)"
+)
+
+
+def _scoped_source(pattern: re.Pattern[str]) -> str | None:
+    """Return the pattern wrapped with its flags, or None if it cannot be merged."""
+    if _NOT_COMBINABLE.search(pattern.pattern):
+        return None
+
+    flags = pattern.flags & ~re.U
+    letters = ""
+    for flag, letter in _SCOPED_FLAGS.items():
+        if flags & flag:
+            letters += letter
+            flags &= ~flag
+    if flags:
+        # re.A and re.L cannot be scoped
+        return None
+
+    source = pattern.pattern
+    if re.X & pattern.flags:
+        # A trailing comment would swallow the closing parenthesis
+        source += "\n"
+    return f"(?{letters}:{source})" if letters else f"(?:{source})"
+
+
+@lru_cache(maxsize=256)
+def _combine(sources: tuple[str, ...]) -> re.Pattern[str]:
+    """Compile an alternation of scoped pattern sources."""
+    return re.compile("|".join(sources))
+
+
+class RegexScanner:
+    """Find the first match of many patterns in a single pass over a text."""
+
+    def __init__(self, patterns: Iterable[re.Pattern[str]]) -> None:
+        """Split the patterns into merged and individually searched ones."""
+        self.combined: dict[re.Pattern[str], str] = {}
+        self.separate: list[re.Pattern[str]] = []
+
+        for pattern in dict.fromkeys(patterns):
+            source = _scoped_source(pattern)
+            if source is not None:
+                try:
+                    _combine((source,))
+                except re.error:
+                    source = None
+            if source is None:
+                self.separate.append(pattern)
+            else:
+                self.combined[pattern] = source
+
+        if self.separate:
+            _LOGGER.debug(
+                "Regular expressions searched individually: %s",
+                [pattern.pattern for pattern in self.separate],
+            )
+
+    def __bool__(self) -> bool:
+        """Return True if there is anything to scan for."""
+        return bool(self.combined or self.separate)
+
+    def scan(self, text: str) -> dict[re.Pattern[str], re.Match[str] | None]:
+        """Return the first match (or None) of every pattern in the text."""
+        results: dict[re.Pattern[str], re.Match[str] | None] = {
+            pattern: pattern.search(text) for pattern in self.separate
+        }
+
+        pending = list(self.combined)
+        pos = 0
+        while pending:
+            candidate = _combine(tuple(self.combined[p] for p in pending)).search(
+                text, pos
+            )
+            if candidate is None:
+                break
+
+            # At least one pending pattern matches here, and none of them
+            # matched anywhere before this position
+            pos = candidate.start()
+            still_pending = []
+            for pattern in pending:
+                match = pattern.match(text, pos)
+                if match is None:
+                    still_pending.append(pattern)
+                else:
+                    results[pattern] = match
+            pending = still_pending
+            pos += 1
+            if pos > len(text):
+                break
+
+        for pattern in pending:
+            results[pattern] = None
+
+        return results
+
+
+# Character classes that contain a line feed
+_NEWLINE_CATEGORIES = {
+    _constants.CATEGORY_SPACE,
+    _constants.CATEGORY_NOT_DIGIT,
+    _constants.CATEGORY_NOT_WORD,
+    _constants.CATEGORY_LINEBREAK,
+    _constants.CATEGORY_UNI_SPACE,
+    _constants.CATEGORY_UNI_NOT_DIGIT,
+    _constants.CATEGORY_UNI_NOT_WORD,
+    _constants.CATEGORY_UNI_LINEBREAK,
+}
+_REPEATS = {
+    _constants.MAX_REPEAT,
+    _constants.MIN_REPEAT,
+    _constants.POSSESSIVE_REPEAT,
+}
+
+
+def _set_matches_newline(items: list) -> bool:
+    """Return True if a parsed character set contains a line feed."""
+    negate = False
+    found = False
+    for op, av in items:
+        if op is _constants.NEGATE:
+            negate = True
+        elif op is _constants.LITERAL:
+            found |= av == 10
+        elif op in (_constants.RANGE, _constants.RANGE_UNI_IGNORE):
+            found |= av[0] <= 10 <= av[1]
+        elif op is _constants.CATEGORY:
+            found |= av in _NEWLINE_CATEGORIES
+        else:
+            return True
+    return found != negate
+
+
+def _stays_in_line(items: list, flags: int) -> bool:
+    """Return True if parsed pattern items match within one complete line.
+
+    Such a match cannot span a line feed and depends only on its own line:
+    no start or end of text anchor, lookahead or character that can be a
+    line feed. With the MULTILINE flag `^` and `$` match at line boundaries
+    and are safe.
+    """
+    for op, av in items:
+        if op is _constants.LITERAL:
+            if av == 10:
+                return False
+        elif op is _constants.NOT_LITERAL:
+            if av != 10:
+                return False
+        elif op is _constants.ANY:
+            if flags & re.S:
+                return False
+        elif op is _constants.IN:
+            if _set_matches_newline(av):
+                return False
+        elif op is _constants.AT:
+            if av in (_constants.AT_BEGINNING_STRING, _constants.AT_END_STRING):
+                return False
+            if av in (_constants.AT_BEGINNING, _constants.AT_END) and not (
+                flags & re.M
+            ):
+                return False
+        elif op is _constants.SUBPATTERN:
+            _, add_flags, del_flags, pattern = av
+            if not _stays_in_line(pattern, (flags | add_flags) & ~del_flags):
+                return False
+        elif op in _REPEATS:
+            if not _stays_in_line(av[2], flags):
+                return False
+        elif op is _constants.BRANCH:
+            if not all(_stays_in_line(branch, flags) for branch in av[1]):
+                return False
+        elif op is _constants.GROUPREF_EXISTS:
+            if not all(_stays_in_line(branch, flags) for branch in av[1:] if branch):
+                return False
+        elif op is _constants.ATOMIC_GROUP:
+            if not _stays_in_line(av, flags):
+                return False
+        elif op in (_constants.ASSERT, _constants.ASSERT_NOT):
+            # A lookbehind within the line only sees text that is complete
+            if av[0] >= 0 or not _stays_in_line(av[1], flags):
+                return False
+        elif op is not _constants.GROUPREF:
+            return False
+    return True
+
+
+def can_watch(pattern: re.Pattern[str]) -> bool:
+    """Return True if the first match in the complete lines of a text is final."""
+    try:
+        parsed = _parser.parse(pattern.pattern, pattern.flags)
+    except (re.error, TypeError):
+        return False
+    return _stays_in_line(list(parsed), parsed.state.flags)
+
+
+class RegexWatcher:
+    """Tell when every pattern has matched in a body that is still arriving.
+
+    Only complete lines are searched, so a value is never taken from a line
+    that is cut off at the end of a chunk. Each round searches the lines
+    completed since the previous round together with those of the previous
+    round, which finds matches spanning a round boundary while keeping the
+    work linear in the size of the body. Only patterns accepted by
+    `can_watch` give the same first match as a search of the whole body.
+    """
+
+    def __init__(self, patterns: Iterable[re.Pattern[str]], encoding: str) -> None:
+        """Initialize the watcher for a body in the given charset."""
+        self._pending = list(dict.fromkeys(patterns))
+        try:
+            self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        except LookupError:
+            self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._text = ""
+        # Length of the lines searched in the previous round, kept in _text
+        self._searched = 0
+
+    def feed(self, chunk: bytes) -> bool:
+        """Add a chunk of the body and return True once all patterns matched."""
+        text = self._text + self._decoder.decode(chunk)
+        end = text.rfind("\n") + 1
+        if end <= self._searched:
+            self._text = text
+            return False
+
+        self._pending = [
+            pattern for pattern in self._pending if pattern.search(text, 0, end) is None
+        ]
+        self._text = text[self._searched :]
+        self._searched = end - self._searched
+        return not self._pending
@@ -13,6 +13,7 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     CONF_SENSOR_DEVICE_CLASS,
+    CONF_SENSOR_ITEMS,
     CONF_SENSOR_NAME,
     CONF_SENSOR_TYPE,
     CONF_SENSOR_UNIT,
@@ -20,7 +21,12 @@ from .const import (
     DOMAIN,
 )
 from .coordinator import HTTPAgentCoordinator
-from .helpers import get_sensor_config
+from .helpers import (
+    ITEM_UNIQUE_ID_SEPARATOR,
+    async_setup_fan_out,
+    get_sensor_config,
+    item_unique_id,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,14 +45,32 @@ async def async_setup_entry(
         data.update(entry.options)
 
     sensors = []
+    fan_out_names = []
     for sensor_config in data[CONF_SENSORS]:
         # Only create sensors of type "sensor"
         if sensor_config.get(CONF_SENSOR_TYPE, "sensor") == "sensor":
             sensor_name = sensor_config[CONF_SENSOR_NAME]
-            sensors.append(HTTPAgentSensor(coordinator, entry, sensor_name))
+            if sensor_config.get(CONF_SENSOR_ITEMS):
+                fan_out_names.append(sensor_name)
+            else:
+                sensors.append(HTTPAgentSensor(coordinator, entry, sensor_name))
 
     async_add_entities(sensors)
 
+    # Fan-out sensors get one entity per element, managed on every refresh
+    for sensor_name in fan_out_names:
+        async_setup_fan_out(
+            hass,
+            entry,
+            coordinator,
+            "sensor",
+            sensor_name,
+            async_add_entities,
+            lambda key, name=sensor_name: HTTPAgentItemSensor(
+                coordinator, entry, name, key
+            ),
+        )
+
     # Clean up removed sensors from entity registry
     from homeassistant.helpers import entity_registry as er
 
@@ -57,6 +81,10 @@ async def async_setup_entry(
         sensor_config[CONF_SENSOR_NAME] for sensor_config in data[CONF_SENSORS]
     }
 
+    fan_out_prefixes = tuple(
+        f"{name}{ITEM_UNIQUE_ID_SEPARATOR}" for name in fan_out_names
+    )
+
     # Find entities to remove (create list first to avoid iteration error)
     entities_to_remove = []
     for entity_id, entity_entry in entity_registry.entities.items():
@@ -66,11 +94,14 @@ async def async_setup_entry(
             and entity_entry.platform == DOMAIN
         ):
 
-            # Extract sensor name from unique_id
+            # Extract sensor name from unique_id, item entities of fan-out
+            # sensors are cleaned up by the fan-out helper
             unique_id = entity_entry.unique_id
             if unique_id and "_" in unique_id:
                 sensor_name = unique_id.split("_", 1)[1]
-                if sensor_name not in current_sensor_names:
+                if sensor_name not in current_sensor_names and not (
+                    sensor_name.startswith(fan_out_prefixes)
+                ):
                     entities_to_remove.append(entity_id)
 
     # Remove obsolete entities
@@ -99,6 +130,11 @@ class HTTPAgentSensor(CoordinatorEntity, SensorEntity):
 
         self.sensor_config = get_sensor_config(entry, sensor_name)
 
+    @property
+    def sensor_data(self) -> dict[str, Any]:
+        """Return the values extracted for this entity."""
+        return (self.coordinator.data or {}).get(self.sensor_name, {})
+
     @property
     def name(self) -> str:
         """Return the name of the sensor."""
@@ -110,8 +146,7 @@ class HTTPAgentSensor(CoordinatorEntity, SensorEntity):
         if not self.coordinator.data:
             return None
 
-        sensor_data = self.coordinator.data.get(self.sensor_name, {})
-        return sensor_data.get("state")
+        return self.sensor_data.get("state")
 
     @property
     def device_class(self) -> str | None:
@@ -133,7 +168,7 @@ class HTTPAgentSensor(CoordinatorEntity, SensorEntity):
         if not self.coordinator.data:
             return None
 
-        sensor_data = self.coordinator.data.get(self.sensor_name, {})
+        sensor_data = self.sensor_data
         icon = sensor_data.get("icon")
 
         # If icon is provided, ensure it starts with mdi:
@@ -148,8 +183,9 @@ class HTTPAgentSensor(CoordinatorEntity, SensorEntity):
         if not self.coordinator.data:
             return {}
 
-        sensor_data = self.coordinator.data.get(self.sensor_name, {})
-        attributes = {}
+        sensor_data = self.sensor_data
+        # Attributes from the sensor's attribute mapping
+        attributes = dict(sensor_data.get("attributes") or {})
 
         # Add color if available
         if sensor_data.get("color"):
@@ -172,3 +208,38 @@ class HTTPAgentSensor(CoordinatorEntity, SensorEntity):
     def available(self) -> bool:
         """Return True if entity is available."""
         return self.coordinator.last_update_success
+
+
+class HTTPAgentItemSensor(HTTPAgentSensor):
+    """HTTP Agent sensor for one element of a fan-out sensor."""
+
+    def __init__(
+        self,
+        coordinator: HTTPAgentCoordinator,
+        entry: ConfigEntry,
+        sensor_name: str,
+        item_key: str,
+    ) -> None:
+        """Initialize the item sensor."""
+        super().__init__(coordinator, entry, sensor_name)
+        self.item_key = item_key
+
+        # Entity properties
+        self._attr_name = f"{sensor_name} {item_key}"
+        self._attr_unique_id = item_unique_id(entry.entry_id, sensor_name, item_key)
+
+    @property
+    def sensor_data(self) -> dict[str, Any]:
+        """Return the values extracted for this element."""
+        sensor_data = (self.coordinator.data or {}).get(self.sensor_name, {})
+        return (sensor_data.get("items") or {}).get(self.item_key, {})
+
+    @property
+    def name(self) -> str:
+        """Return the name of the sensor."""
+        return self._attr_name
+
+    @property
+    def available(self) -> bool:
+        """Return True if the element was present in the last response."""
+        return super().available and bool(self.sensor_data)
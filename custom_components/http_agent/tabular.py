@@ -0,0 +1,115 @@
+"""CSV and TSV extraction for HTTP Agent.
+
+Tabular responses are parsed once into rows addressed by the header
+columns. Cell selectors pick a row by the value of a key column or by its
+position, and a column by name:
+
+    host=web01/cpu       the cpu column of the first row whose host is web01
+    0/cpu                the cpu column of the first data row
+    -1/cpu               the cpu column of the last row
+
+Key column indexes are built on first use, so every later lookup on the same
+column is a dictionary access.
+"""
+
+from __future__ import annotations
+
+import csv
+from io import StringIO
+import re
+
+# Media type of tab separated values
+TSV_MEDIA_TYPE = "text/tab-separated-values"
+
+# Delimiters recognized in the header line of other responses
+_DELIMITERS = (",", ";", "\t")
+
+_CELL_SELECTOR = re.compile(
+    r"^(?:(?P<key>[^=/]+)=(?P<value>[^/]*)|(?P<index>-?\d+))/(?P<column>[^/]+)$"
+)
+
+
+class CellSelector:
+    """A compiled `key=value/column` or `index/column` selector."""
+
+    __slots__ = ("key", "value", "index", "column")
+
+    def __init__(
+        self, key: str | None, value: str | None, index: int | None, column: str
+    ) -> None:
+        """Initialize the selector."""
+        self.key = key
+        self.value = value
+        self.index = index
+        self.column = column
+
+
+def compile_cell_selector(selector: str) -> CellSelector | None:
+    """Compile a cell selector, or return None if the selector is not one."""
+    match = _CELL_SELECTOR.match(selector.strip())
+    if match is None:
+        return None
+    if match.group("index") is not None:
+        return CellSelector(
+            None, None, int(match.group("index")), match.group("column").strip()
+        )
+    return CellSelector(
+        match.group("key").strip(),
+        match.group("value").strip(),
+        None,
+        match.group("column").strip(),
+    )
+
+
+class Table:
+    """Rows of a CSV or TSV document, addressed by header column."""
+
+    __slots__ = ("columns", "rows", "_indexes")
+
+    def __init__(self, text: str, media_type: str = "") -> None:
+        """Parse the document, taking column names from the first row."""
+        if media_type == TSV_MEDIA_TYPE:
+            delimiter = "\t"
+        else:
+            header = text[: text.find("\n")] if "\n" in text else text
+            delimiter = max(_DELIMITERS, key=header.count)
+
+        reader = csv.reader(StringIO(text), delimiter=delimiter)
+        self.columns: dict[str, int] = {}
+        for position, name in enumerate(next(reader, [])):
+            self.columns.setdefault(name.strip(), position)
+        self.rows = [row for row in reader if row]
+        self._indexes: dict[int, dict[str, list[str]]] = {}
+
+    def _index(self, position: int) -> dict[str, list[str]]:
+        """Return the rows keyed by the value of a column, building it once."""
+        if position not in self._indexes:
+            index: dict[str, list[str]] = {}
+            for row in self.rows:
+                if position < len(row):
+                    index.setdefault(row[position].strip(), row)
+            self._indexes[position] = index
+        return self._indexes[position]
+
+    def cell(self, selector: CellSelector) -> str | None:
+        """Return the value of the selected cell, or None if there is none."""
+        column = self.columns.get(selector.column)
+        if column is None:
+            return None
+
+        if selector.index is not None:
+            try:
+                row = self.rows[selector.index]
+            except IndexError:
+                return None
+        else:
+            key_column = self.columns.get(selector.key)
+            if key_column is None:
+                return None
+            row = self._index(key_column).get(selector.value)
+            if row is None:
+                return None
+
+        if column >= len(row):
+            return None
+        return row[column].strip()
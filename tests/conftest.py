@@ -0,0 +1,23 @@
+"""Test configuration for the HTTP Agent integration.
+
+The parsing modules do not use Home Assistant. When it is not installed,
+the integration package is registered without running its __init__, which
+sets up the config entries, so those modules can still be imported and
+tested.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+import sys
+from types import ModuleType
+
+PACKAGE = "custom_components.http_agent"
+
+if importlib.util.find_spec("homeassistant") is None and PACKAGE not in sys.modules:
+    _package = ModuleType(PACKAGE)
+    _package.__path__ = [
+        str(Path(__file__).parents[1] / "custom_components" / "http_agent")
+    ]
+    sys.modules[PACKAGE] = _package
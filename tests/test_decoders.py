@@ -0,0 +1,55 @@
+"""Tests for the JSON and binary body decoders."""
+
+from __future__ import annotations
+
+import json
+import math
+
+import pytest
+
+from custom_components.http_agent.decoders import (
+    json_dumps,
+    json_loads,
+    json_loads_body,
+)
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        '{"a": NaN, "b": -Infinity}',
+        '{"big": 18446744073709551616, "neg": -9223372036854775809}',
+        '{"small": 9223372036854775807, "float": 1.5}',
+        '[1, "text \\u00e9", null, true]',
+    ],
+)
+def test_loads_like_the_standard_library(document: str) -> None:
+    """Test documents parse exactly as the standard library parses them."""
+    expected = json.loads(document)
+    for data in (document, document.encode()):
+        result = json_loads(data)
+        assert repr(result) == repr(expected)
+
+
+def test_loads_body_with_bom() -> None:
+    """Test a UTF-8 byte order mark is ignored."""
+    assert json_loads_body(b'\xef\xbb\xbf{"a": 1}') == {"a": 1}
+
+
+def test_loads_invalid() -> None:
+    """Test invalid documents still raise."""
+    with pytest.raises(ValueError):
+        json_loads(b'{"a": ')
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        {"big": 18446744073709551616},
+        {"nan": math.nan, "inf": math.inf},
+        {"a": [1, 2.5, "x", None, True]},
+    ],
+)
+def test_dumps_round_trip(value: object) -> None:
+    """Test payloads are serialized without losing values."""
+    assert repr(json.loads(json_dumps(value))) == repr(value)
@@ -0,0 +1,103 @@
+"""Tests for streaming decompression."""
+
+from __future__ import annotations
+
+import gzip
+import zlib
+
+import pytest
+
+from custom_components.http_agent import decompress
+from custom_components.http_agent.decompress import (
+    DecompressionLimitError,
+    get_decompressor,
+)
+
+BODY = b"".join(b"line %d of the body\n" % number for number in range(50000))
+
+
+def _compress(encoding: str, data: bytes) -> bytes:
+    """Compress data with a content coding."""
+    if encoding == "gzip":
+        return gzip.compress(data)
+    if encoding == "deflate":
+        return zlib.compress(data)
+    if encoding == "br":
+        return decompress.brotli.compress(data, quality=5)
+    return decompress.zstandard.ZstdCompressor().compress(data)
+
+
+def _available(encoding: str) -> bool:
+    """Return True if the package of an encoding is installed."""
+    if encoding == "br":
+        return decompress.brotli is not None
+    if encoding == "zstd":
+        return decompress.zstandard is not None
+    return True
+
+
+ENCODINGS = [
+    pytest.param(
+        encoding,
+        marks=pytest.mark.skipif(
+            not _available(encoding), reason=f"no {encoding} decoder installed"
+        ),
+    )
+    for encoding in ("gzip", "deflate", "br", "zstd")
+]
+
+
+def _decode(decompressor, data: bytes, size: int) -> bytes:
+    """Feed data to a decoder in chunks of the given size."""
+    output = [
+        decompressor.decompress(data[start : start + size])
+        for start in range(0, len(data), size)
+    ]
+    output.append(decompressor.flush())
+    return b"".join(output)
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+@pytest.mark.parametrize("max_size", [0, len(BODY)])
+def test_round_trip(encoding: str, max_size: int) -> None:
+    """Test bodies decode completely within the limit."""
+    data = _compress(encoding, BODY)
+    assert _decode(get_decompressor(encoding, max_size), data, 1000) == BODY
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_limit_stops_expansion(encoding: str) -> None:
+    """Test a highly compressed chunk is stopped close to the limit."""
+    bomb = _compress(encoding, bytes(10_000_000))
+    decompressor = get_decompressor(encoding, 100_000)
+    with pytest.raises(DecompressionLimitError):
+        decompressor.decompress(bomb)
+    # At most one piece of output past the limit was produced
+    assert decompressor._size <= 100_000 + 2 * decompress._OUTPUT_STEP
+
+
+def test_raw_deflate() -> None:
+    """Test deflate sent without the zlib header is decoded."""
+    encoder = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    data = encoder.compress(BODY) + encoder.flush()
+    assert _decode(get_decompressor("deflate"), data, 4096) == BODY
+
+
+def test_concatenated_zstd_frames() -> None:
+    """Test several Zstandard frames decode as one body."""
+    if decompress.zstandard is None:
+        pytest.skip("no zstd decoder installed")
+    data = _compress("zstd", BODY[:1000]) + _compress("zstd", BODY[1000:])
+    assert _decode(get_decompressor("zstd"), data, 777) == BODY
+
+
+@pytest.mark.parametrize("encoding", ["", "identity", " Identity "])
+def test_identity(encoding: str) -> None:
+    """Test uncompressed bodies need no decoder."""
+    assert get_decompressor(encoding) is None
+
+
+def test_unsupported() -> None:
+    """Test an unknown encoding is reported."""
+    with pytest.raises(ValueError):
+        get_decompressor("compress")
@@ -0,0 +1,92 @@
+"""Tests for the extraction of sensor values from responses."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+
+from custom_components.http_agent.const import (
+    CONF_SENSOR_ATTRIBUTES,
+    CONF_SENSOR_ITEM_KEY,
+    CONF_SENSOR_ITEMS,
+    CONF_SENSOR_NAME,
+    CONF_SENSOR_STATE,
+)
+from custom_components.http_agent.extractor import ExtractionPlan, HTTPResponse
+
+DEVICES = {
+    "data": {
+        "devices": [
+            {"id": "a", "temp": 21, "online": True},
+            {"id": "b", "temp": 18, "online": False},
+        ]
+    }
+}
+
+
+def _items(items: str, document: Any, item_key: str | None = "id") -> dict | None:
+    """Extract the items of a fan-out sensor from a JSON document."""
+    sensor = {
+        CONF_SENSOR_NAME: "fleet",
+        CONF_SENSOR_ITEMS: items,
+        CONF_SENSOR_STATE: "temp",
+    }
+    if item_key:
+        sensor[CONF_SENSOR_ITEM_KEY] = item_key
+    response = HTTPResponse(
+        json.dumps(document).encode(), 200, {"Content-Type": "application/json"}
+    )
+    return ExtractionPlan([sensor]).extract(response)["fleet"]["items"]
+
+
+@pytest.mark.parametrize(
+    "items", ["data.devices", "$.data.devices", "$['data'].devices"]
+)
+def test_items_of_an_array(items: str) -> None:
+    """Test a path to an array gives one item per element."""
+    assert {key: item["state"] for key, item in _items(items, DEVICES).items()} == {
+        "a": 21,
+        "b": 18,
+    }
+
+
+def test_items_of_a_filter_with_one_match() -> None:
+    """Test a filter matching a single element gives that element as an item."""
+    items = _items("$.data.devices[?(@.online == true)]", DEVICES)
+    assert list(items) == ["a"]
+    assert items["a"]["state"] == 21
+
+    items = _items("$.data.devices[?(@.online == true)]", DEVICES, None)
+    assert list(items) == ["0"]
+
+
+def test_items_of_a_filter_without_matches() -> None:
+    """Test a filter matching nothing gives no items."""
+    assert _items("$.data.devices[?(@.temp > 30)]", DEVICES) == {}
+
+
+@pytest.mark.parametrize(
+    "items", ["data.devices", "$.data.devices", "$.data.devices[*]"]
+)
+def test_items_of_an_error_payload(items: str) -> None:
+    """Test a response without the elements does not give an empty selection."""
+    assert _items(items, {"error": "unavailable"}) is None
+
+
+def test_invalid_item_paths_are_left_out(caplog: pytest.LogCaptureFixture) -> None:
+    """Test an invalid field path of a fan-out sensor does not fail extraction."""
+    sensor = {
+        CONF_SENSOR_NAME: "fleet",
+        CONF_SENSOR_ITEMS: "data.devices",
+        CONF_SENSOR_ITEM_KEY: "id",
+        CONF_SENSOR_STATE: "$.temp[",
+        CONF_SENSOR_ATTRIBUTES: "online: $.online[",
+    }
+    response = HTTPResponse(json.dumps(DEVICES).encode(), 200, {})
+    items = ExtractionPlan([sensor]).extract(response)["fleet"]["items"]
+    assert list(items) == ["a", "b"]
+    assert "state" not in items["a"]
+    assert items["a"]["attributes"] == {"online": None}
+    assert "'$.temp[' of sensor 'fleet' is not a valid JSON path" in caplog.text
@@ -0,0 +1,165 @@
+"""Tests for compiled JSONPath expressions."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.http_agent.jsonpath import JSONPath, JSONPathError
+
+STORE = {
+    "store": {
+        "book": [
+            {"title": "A", "author": "X", "price": 8.95, "tags": ["old"]},
+            {"title": "B", "author": "Y", "price": 12.99, "isbn": "1-2"},
+            {"title": "C", "author": "X", "price": 8.99, "isbn": "3-4"},
+            {"title": "D", "author": "Z", "price": 22.99},
+        ],
+        "bicycle": {"color": "red", "price": 19.95},
+        "odd key": {"a.b": 1, "it's": 2},
+    },
+    "devices": [
+        {"id": "kitchen", "temperature": 21.5, "online": True},
+        {"id": "garage", "temperature": 4, "online": False},
+        {"id": "attic", "online": True},
+    ],
+}
+
+
+@pytest.mark.parametrize(
+    ("expression", "expected"),
+    [
+        ("$.store.bicycle.color", "red"),
+        ("$['store']['bicycle']['color']", "red"),
+        ('$["store"].bicycle["price"]', 19.95),
+        ("$.store['odd key']['a.b']", 1),
+        ("$.store['odd key']['it\\'s']", 2),
+        ("$.store.book[0].title", "A"),
+        ("$.store.book[-1].title", "D"),
+        ("$.store.book[-4].title", "A"),
+        ("$.store.book[*].author", ["X", "Y", "X", "Z"]),
+        ("$.store.book.*.title", ["A", "B", "C", "D"]),
+        ("$.store.book[1:3].title", ["B", "C"]),
+        ("$.store.book[:2].title", ["A", "B"]),
+        ("$.store.book[-2:].title", ["C", "D"]),
+        ("$.store.book[::2].title", ["A", "C"]),
+        ("$.store.book[::-1].title", ["D", "C", "B", "A"]),
+        ("$.store.book[0,-1].title", ["A", "D"]),
+        ("$.store.book[0]['title','author']", ["A", "X"]),
+        ("$..isbn", ["1-2", "3-4"]),
+        ("$.store..price", [8.95, 12.99, 8.99, 22.99, 19.95]),
+        ("$..book[0].tags[0]", "old"),
+        ("$", STORE),
+    ],
+)
+def test_selectors(expression: str, expected: object) -> None:
+    """Test member, index, wildcard, slice, union and descent selectors."""
+    assert JSONPath(expression).extract(STORE) == expected
+
+
+@pytest.mark.parametrize(
+    ("expression", "expected"),
+    [
+        ("$.devices[?(@.id == 'garage')].temperature", 4),
+        ('$.devices[?(@.id == "kitchen")].temperature', 21.5),
+        ("$.devices[?(@.temperature > 10)].id", "kitchen"),
+        ("$.devices[?(@.temperature <= 4)].id", "garage"),
+        ("$.devices[?(@.temperature)].id", ["kitchen", "garage"]),
+        ("$.devices[?(!@.temperature)].id", "attic"),
+        ("$.devices[?(@.online == true)].id", ["kitchen", "attic"]),
+        ("$.devices[?(@.online == false || @.id == 'attic')].id", ["garage", "attic"]),
+        ("$.devices[?(@.online && (@.temperature < 0 || @.id =~ /^k/))].id", "kitchen"),
+        ("$.devices[?(@.id =~ /ATTIC/i)].online", True),
+        ("$.devices[?(@.id != 'kitchen')].id", ["garage", "attic"]),
+        ("$.devices[?(@.temperature != 4)].id", ["kitchen", "attic"]),
+        ("$.store.book[?(@.price < $.store.bicycle.price)].title", ["A", "B", "C"]),
+        ("$.store.book[?(@.tags[0] == 'old')].title", "A"),
+        ("$.store.book[?(@.price > 1e1)].title", ["B", "D"]),
+        ("$.devices[?(@.id == 'nowhere')].id", None),
+        ("$.devices[?(@.id > 1)].id", None),
+    ],
+)
+def test_filters(expression: str, expected: object) -> None:
+    """Test filter expressions."""
+    assert JSONPath(expression).extract(STORE) == expected
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "$.store.missing",
+        "$.store.book[4]",
+        "$.store.book[-5]",
+        "$.store.bicycle[0]",
+        "$.store.book.title",
+        "$.store.book[10:]",
+    ],
+)
+def test_no_match(expression: str) -> None:
+    """Test expressions that match nothing return None."""
+    assert JSONPath(expression).extract(STORE) is None
+    assert JSONPath(expression).find(STORE) == []
+
+
+def test_indexes_do_not_select_object_members() -> None:
+    """Test array indexes only apply to arrays."""
+    assert JSONPath("$[0]").extract({"0": "member"}) is None
+    assert JSONPath("$['0']").extract({"0": "member"}) == "member"
+
+
+@pytest.mark.parametrize(
+    ("expression", "prefix"),
+    [
+        ("$.store.book[0].title", ("store", "book")),
+        ("$['store']['odd key'].x", ("store", "odd key", "x")),
+        ("$.store.*.price", ("store",)),
+        ("$..price", ()),
+        ("$.devices[?(@.online)].id", ("devices",)),
+        ("$.items[?(@.id == $.want)].v", ()),
+        ("$.a.b..[?(@.id == $['want'])]", ()),
+        ("$", ()),
+    ],
+)
+def test_prefix(expression: str, prefix: tuple[str, ...]) -> None:
+    """Test the leading member names used to limit streaming parsing."""
+    assert JSONPath(expression).prefix == prefix
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "store.book",
+        "$.store.book[0",
+        "$.store.book[0:1:0]",
+        "$.store.book[?(@.price <)]",
+        "$.store.book[?(@.price == 1]",
+        "$.store.book[?(@.title =~ 'A')]",
+        "$.store.book[?(@.title =~ /(/)]",
+        "$.store.book[?(@.title =~ /a{2,1}/i)]",
+        "$.store.book[?(@.price # 1)]",
+        "$.store.book[a b]",
+        "$ store",
+    ],
+)
+def test_invalid_expressions(expression: str) -> None:
+    """Test invalid expressions raise JSONPathError."""
+    with pytest.raises(JSONPathError):
+        JSONPath(expression)
+
+
+@pytest.mark.parametrize(
+    ("expression", "singular"),
+    [
+        ("$", True),
+        ("$.store.book[0].title", True),
+        ("$['store'][\"book\"][-1]", True),
+        ("$.store.*", False),
+        ("$.store.book[*]", False),
+        ("$.store.book[0:1]", False),
+        ("$.store.book[0,1]", False),
+        ("$.store.book[?(@.price)]", False),
+        ("$..book", False),
+    ],
+)
+def test_singular(expression: str, singular: bool) -> None:
+    """Test which expressions can only select a single value."""
+    assert JSONPath(expression).singular is singular
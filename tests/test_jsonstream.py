@@ -0,0 +1,107 @@
+"""Tests for the streaming JSON extractor."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.http_agent.jsonstream import StreamingJSONExtractor
+
+
+def _extract(document: str, paths: list[tuple[str, ...]], size: int) -> dict | None:
+    """Feed a document in chunks of the given size and return the result."""
+    extractor = StreamingJSONExtractor(paths)
+    for start in range(0, len(document), size):
+        if extractor.feed(document[start : start + size]):
+            break
+    extractor.close()
+    return extractor.result
+
+
+DOCUMENT = (
+    '{"skip": "a \\"quoted\\" } ] string", "nested": {"deep": [1, {"x": "}"}]},'
+    ' "data": {"temp": -12.5e1, "name": "caf\\u00e9 \\\\ \\"x\\"", "ok": true,'
+    ' "none": null, "list": [10, 20, {"id": "c"}]}, "tail": [1, 2, 3]}'
+)
+
+
+@pytest.mark.parametrize("size", range(1, len(DOCUMENT) + 1))
+def test_chunk_boundaries(size: int) -> None:
+    """Test every chunk size gives the same result as a single chunk."""
+    paths = [
+        ("data", "temp"),
+        ("data", "name"),
+        ("data", "ok"),
+        ("data", "none"),
+        ("data", "list", "2", "id"),
+    ]
+    assert _extract(DOCUMENT, paths, size) == {
+        "data": {
+            "temp": -125.0,
+            "name": 'café \\ "x"',
+            "ok": True,
+            "none": None,
+            "list": {"2": {"id": "c"}},
+        }
+    }
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7])
+def test_escaped_keys(size: int) -> None:
+    """Test keys with escapes are matched by their decoded form."""
+    document = '{"a\\"b": 1, "\\u0063": {"d": "e"}}'
+    assert _extract(document, [('a"b',), ("c", "d")], size) == {
+        'a"b': 1,
+        "c": {"d": "e"},
+    }
+
+
+def test_arrays_are_index_keyed_dicts() -> None:
+    """Test arrays on the way to a path are represented by index-keyed dicts."""
+    document = '[{"v": 1}, {"v": 2}, [3, [4, 5]]]'
+    result = _extract(document, [("1", "v"), ("2", "1", "0")], len(document))
+    assert result == {"1": {"v": 2}, "2": {"1": {"0": 4}}}
+
+
+def test_captured_arrays_stay_lists() -> None:
+    """Test a path ending at an array captures the whole array."""
+    document = '{"items": [1, [2, 3], {"a": []}]}'
+    assert _extract(document, [("items",)], 4) == {"items": [1, [2, 3], {"a": []}]}
+
+
+def test_stops_once_resolved() -> None:
+    """Test the extractor is done as soon as every path has been read."""
+    extractor = StreamingJSONExtractor([("a",), ("b",)])
+    assert not extractor.feed('{"a": 1, "b": [2')
+    assert extractor.feed("], ")
+    assert extractor.result == {"a": 1, "b": [2]}
+
+
+def test_literal_at_chunk_end() -> None:
+    """Test a literal is not read before its end has arrived."""
+    extractor = StreamingJSONExtractor([("a",)])
+    assert not extractor.feed('{"a": 12')
+    assert extractor.feed("34}")
+    assert extractor.result == {"a": 1234}
+
+
+def test_missing_paths_resolve_at_container_end() -> None:
+    """Test paths that are absent resolve when their container closes."""
+    extractor = StreamingJSONExtractor([("data", "missing"), ("other",)])
+    assert not extractor.feed('{"data": {"present": 1}')
+    assert extractor.feed("}")
+    assert extractor.result == {"data": {}}
+
+
+def test_no_paths_is_done() -> None:
+    """Test an extractor without paths does not need the document."""
+    extractor = StreamingJSONExtractor([])
+    assert extractor.done
+    assert extractor.feed("{")
+
+
+@pytest.mark.parametrize(
+    "document", ["", '{"a": [1, 2', '"text"', "42", '{"a" 1}', '{"a": 1]']
+)
+def test_invalid_documents(document: str) -> None:
+    """Test truncated, scalar and malformed documents have no result."""
+    assert _extract(document, [("b",)], 3) is None
@@ -0,0 +1,110 @@
+"""Tests for Prometheus and OpenMetrics extraction."""
+
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from custom_components.http_agent.metrics import (
+    Metrics,
+    compile_metric_selector,
+    is_exposition,
+)
+
+EXPOSITION = """\
+# HELP http_requests_total Requests.
+# TYPE http_requests_total counter
+http_requests_total{method="post",code="200"} 1027 1395066363000
+http_requests_total{method="post",code="400"}    3 1395066363000
+http_requests_total{code="500",method="get"} 5
+http_requests_total{code="500",method="post"} 6
+node_load1 0.42
+node_boot_time_seconds 1.7e9
+escaped{path="C:\\\\dir\\"x\\"",text="a\\nb",brace="}"} 7
+no_labels{} 8
+weird_value NaN
+positive +Inf
+broken{ 1
+broken2
+# EOF
+"""
+
+
+@pytest.mark.parametrize(
+    ("selector", "expected"),
+    [
+        ("node_load1", 0.42),
+        ("node_boot_time_seconds", 1700000000),
+        ('http_requests_total{method="post",code="200"}', 1027),
+        ('http_requests_total{code="200",method="post"}', 1027),
+        ('http_requests_total{ code = "400" }', 3),
+        ('http_requests_total{code="500"}', 5),
+        ('http_requests_total{code="500",method="post"}', 6),
+        ("http_requests_total", 1027),
+        ('http_requests_total{code="404"}', None),
+        ('escaped{path="C:\\\\dir\\"x\\""}', 7),
+        ('escaped{text="a\\nb"}', 7),
+        ('escaped{brace="}"}', 7),
+        ("no_labels", 8),
+        ("positive", math.inf),
+        ("broken", None),
+        ("missing", None),
+    ],
+)
+def test_values(selector: str, expected: float | int | None) -> None:
+    """Test exact and partial label matches."""
+    metric_selector = compile_metric_selector(selector)
+    assert metric_selector is not None
+    value = Metrics(EXPOSITION).value(metric_selector)
+    assert value == expected
+    assert type(value) is type(expected)
+
+
+def test_nan() -> None:
+    """Test NaN values are kept as float."""
+    value = Metrics(EXPOSITION).value(compile_metric_selector("weird_value"))
+    assert math.isnan(value)
+
+
+def test_first_sample_of_a_series_wins() -> None:
+    """Test a repeated series keeps its first value."""
+    metrics = Metrics('a{x="1"} 1\na{x="1"} 2\n')
+    assert metrics.value(compile_metric_selector('a{x="1"}')) == 1
+
+
+def test_partial_match_is_remembered() -> None:
+    """Test a partial label match is only searched once per response."""
+    metrics = Metrics('a{x="1",y="2"} 1\n')
+    selector = compile_metric_selector('a{y="2"}')
+    assert metrics.value(selector) == 1
+    metrics.series["a"].clear()
+    assert metrics.value(selector) == 1
+
+
+@pytest.mark.parametrize(
+    "selector", ["$.value", "a/b", "1metric", 'a{x="1"', "a b", "host=x/cpu"]
+)
+def test_not_metric_selectors(selector: str) -> None:
+    """Test selectors of other kinds are not taken for metric selectors."""
+    assert compile_metric_selector(selector) is None
+
+
+@pytest.mark.parametrize(
+    ("media_type", "content_type", "expected"),
+    [
+        (
+            "application/openmetrics-text",
+            "application/openmetrics-text; version=1.0.0",
+            True,
+        ),
+        ("text/plain", "text/plain; version=0.0.4; charset=utf-8", True),
+        ("text/plain", "text/plain;version=0.0.4", True),
+        ("text/plain", "text/plain; charset=utf-8", False),
+        ("text/plain", "text/plain; version=0.0.41", False),
+        ("text/html", "text/html; version=0.0.4", False),
+    ],
+)
+def test_is_exposition(media_type: str, content_type: str, expected: bool) -> None:
+    """Test which Content-Types announce a metrics exposition."""
+    assert is_exposition(media_type, content_type) is expected
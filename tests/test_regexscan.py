@@ -0,0 +1,189 @@
+"""Tests for single-pass regular expression scanning."""
+
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from custom_components.http_agent.regexscan import RegexScanner, RegexWatcher, can_watch
+
+TEXT = "temp=21\nname: ab\nx temp=22\n  humidity 40%\nend"
+
+PATTERNS = [
+    re.compile(r"^temp=(\d+)"),
+    re.compile(r"^x temp=(\d+)"),
+    re.compile(r"^x temp=(\d+)", re.M),
+    re.compile(r"^\s+humidity"),
+    re.compile(r"(?<=temp=)\d+"),
+    re.compile(r"(?<=x temp=)\d+"),
+    re.compile(r"(?<!x )temp=(\d+)"),
+    re.compile(r"(?<=\n)x"),
+    re.compile(r"\btemp"),
+    re.compile(r"\Btemp"),
+    re.compile(r"HUMIDITY (\d+)", re.I),
+    re.compile(r"end$"),
+    re.compile(r"\d+$", re.M),
+    re.compile(r"\Aname"),
+    re.compile(r"name: (?=ab)(\w+)"),
+    re.compile(r"a # the letter a", re.X),
+    re.compile(r"temp.*end", re.S),
+    re.compile(r"(\w)\1"),
+    re.compile(r"(?P<value>\d+)%"),
+    re.compile(r"(?i)END"),
+    re.compile(r"nowhere"),
+    re.compile(r""),
+]
+
+
+def _span(match: re.Match[str] | None) -> tuple | None:
+    """Return what identifies a match, or None."""
+    return None if match is None else (match.span(), match.groups())
+
+
+@pytest.mark.parametrize("pattern", PATTERNS, ids=lambda p: p.pattern)
+def test_scan_matches_search(pattern: re.Pattern[str]) -> None:
+    """Test every pattern gets the match a search of its own would find."""
+    results = RegexScanner(PATTERNS).scan(TEXT)
+    assert _span(results[pattern]) == _span(pattern.search(TEXT))
+
+
+def test_anchors_and_lookbehind_are_combined() -> None:
+    """Test anchors and lookbehinds do not prevent merging the patterns."""
+    scanner = RegexScanner(PATTERNS)
+    assert re.compile(r"^temp=(\d+)") in scanner.combined
+    assert re.compile(r"(?<=x temp=)\d+") in scanner.combined
+    assert re.compile(r"\d+$", re.M) in scanner.combined
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [r"(\w)\1", r"(?P<value>\d+)%", r"(?i)END", r"(a)?(?(1)b|c)"],
+)
+def test_position_dependent_patterns_are_separate(pattern: str) -> None:
+    """Test backreferences, named groups and global flags are searched alone."""
+    compiled = re.compile(pattern)
+    scanner = RegexScanner([compiled])
+    assert scanner.separate == [compiled]
+    assert not scanner.combined
+
+
+def test_scan_from_later_positions() -> None:
+    """Test a pattern anchored at the start is not matched after the first line."""
+    late = re.compile(r"x")
+    anchored = re.compile(r"^x")
+    results = RegexScanner([late, anchored]).scan("ax\nx")
+    assert results[late].start() == 1
+    assert results[anchored] is None
+
+
+def test_duplicates_and_empty() -> None:
+    """Test duplicate patterns are scanned once and no patterns scan nothing."""
+    pattern = re.compile(r"\d")
+    scanner = RegexScanner([pattern, re.compile(r"\d")])
+    assert list(scanner.combined) == [pattern]
+    assert scanner.scan("a1")[pattern].group() == "1"
+    assert not RegexScanner([])
+    assert RegexScanner([]).scan("text") == {}
+
+
+def _first_stop(patterns: list[re.Pattern[str]], body: bytes, size: int) -> int | None:
+    """Return the number of bytes fed when the watcher stops, or None."""
+    watcher = RegexWatcher(patterns, "utf-8")
+    for start in range(0, len(body), size):
+        if watcher.feed(body[start : start + size]):
+            return min(start + size, len(body))
+    return None
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 64])
+def test_watcher_waits_for_complete_lines(size: int) -> None:
+    """Test the watcher stops after the line completing the last match."""
+    body = "a=1\nb=22\nc=3\nd=4\n".encode()
+    patterns = [re.compile(r"a=(\d+)"), re.compile(r"b=(\d+)")]
+    stop = _first_stop(patterns, body, size)
+    assert stop is not None
+    assert body[:stop].count(b"\n") >= 2
+    assert stop - size <= body.index(b"\nc=")
+
+
+def test_watcher_match_across_rounds() -> None:
+    """Test a match spanning lines fed in different rounds is found."""
+    watcher = RegexWatcher([re.compile(r"start\nend")], "utf-8")
+    assert not watcher.feed(b"start\n")
+    assert watcher.feed(b"end\n")
+
+
+def test_watcher_decodes_split_characters() -> None:
+    """Test a multibyte character split between chunks is decoded once."""
+    body = "temp: 21 \u00b0C\n".encode()
+    split = body.index(b"\xb0")
+    watcher = RegexWatcher([re.compile(r"21 \u00b0C")], "utf-8")
+    assert not watcher.feed(body[:split])
+    assert watcher.feed(body[split:])
+
+
+def test_watcher_without_match() -> None:
+    """Test the watcher keeps reading while a pattern has not matched."""
+    assert _first_stop([re.compile(r"missing")], b"a\nb\nc\n", 2) is None
+
+
+@pytest.mark.parametrize(
+    ("pattern", "flags", "watchable"),
+    [
+        (r"version=(\S+)", 0, True),
+        (r"(?i)temp: (\d+)", 0, True),
+        (r"price \$(\d+)", 0, True),
+        (r"version=(\S+)$", 0, False),
+        (r"version=(\S+)$", re.M, True),
+        (r"(?m)version=(\S+)$", 0, True),
+        (r"a\\$", 0, False),
+        (r"x\Z", 0, False),
+        (r"x\Z", re.M, False),
+        (r"a(?=b)", 0, False),
+        (r"a(?!b)", 0, False),
+        (r"a.*b", re.S, False),
+        (r"(?s)a.*b", 0, False),
+        (r"(?is:a.*b)", 0, False),
+        (r"(?s)abc", 0, True),
+        (r"Load:([\d\s.]+)", 0, False),
+        (r"<pre>([^<]+)", 0, False),
+        (r"<pre>([^<\n]+)", 0, True),
+        (r"temp\W(\d+)", 0, False),
+        (r"temp\D(\d+)", 0, False),
+        (r"[\x00-\x7f]+", 0, False),
+        (r"a\nb", 0, False),
+        (r"[$](\d+)", 0, True),
+        (r"\btemp (\S+)", 0, True),
+        (r"(?<=temp=)\d+", 0, True),
+        (r"(?<!x )temp", 0, True),
+        (r"(?<=\n)x", 0, False),
+        (r"(?<![^x])y", 0, False),
+        (r"^temp", 0, False),
+        (r"^temp", re.M, True),
+        (r"\Atemp", re.M, False),
+        (r"(a|b\s)c", 0, False),
+        (r"(?>a+)(b)?(?(1)c|d)", 0, True),
+    ],
+)
+def test_can_watch(pattern: str, flags: int, watchable: bool) -> None:
+    """Test which patterns give their final match on a prefix of the body."""
+    assert can_watch(re.compile(pattern, flags)) is watchable
+
+
+def test_watched_line_break_would_stop_early() -> None:
+    """Test the case can_watch rejects: a match could continue on later lines."""
+    pattern = re.compile(r"Load:([\d\s.]+)")
+    body = b"Load: 1.5\n 2.5\n 3.7 7.8\n"
+    assert pattern.search(body.decode()).group(1) == " 1.5\n 2.5\n 3.7 7.8\n"
+    assert RegexWatcher([pattern], "utf-8").feed(body[:10])
+    assert not can_watch(pattern)
+
+
+def test_watched_end_anchor_would_stop_early() -> None:
+    """Test the case can_watch rejects: the first prefix match is not final."""
+    pattern = re.compile(r"version=(\S+)$")
+    body = b"version=1\nfoo\nversion=2\nbar\nversion=3"
+    assert pattern.search(body.decode()).group(1) == "3"
+    assert RegexWatcher([pattern], "utf-8").feed(body[:10])
+    assert not can_watch(pattern)
@@ -0,0 +1,82 @@
+"""Tests for CSV and TSV extraction."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.http_agent.tabular import (
+    TSV_MEDIA_TYPE,
+    Table,
+    compile_cell_selector,
+)
+
+CSV = (
+    "host, cpu ,memory,note\n"
+    'web01,12.5,2048,"first, quoted"\n'
+    "web02,80,4096\n"
+    "\n"
+    "web01,99,1,duplicate\n"
+    'db01,3,8192,"line\nbreak"\n'
+)
+
+
+@pytest.mark.parametrize(
+    ("selector", "expected"),
+    [
+        ("host=web01/cpu", "12.5"),
+        ("host=web02/memory", "4096"),
+        ("host = db01 / note", "line\nbreak"),
+        ("cpu=80/host", "web02"),
+        ("0/note", "first, quoted"),
+        ("-1/host", "db01"),
+        ("2/note", "duplicate"),
+        ("host=web02/note", None),
+        ("host=web03/cpu", None),
+        ("owner=web01/cpu", None),
+        ("host=web01/disk", None),
+        ("4/host", None),
+        ("-5/host", None),
+    ],
+)
+def test_cells(selector: str, expected: str | None) -> None:
+    """Test cells selected by key column value and by row position."""
+    cell_selector = compile_cell_selector(selector)
+    assert cell_selector is not None
+    assert Table(CSV).cell(cell_selector) == expected
+
+
+@pytest.mark.parametrize(
+    ("text", "media_type"),
+    [
+        ("name;value\nx;1,5\n", ""),
+        ("name\tvalue\nx\t1,5\n", ""),
+        ("name\tvalue\nx\t1,5\n", TSV_MEDIA_TYPE),
+        ('name,value\nx,"1,5"\n', "text/csv"),
+    ],
+)
+def test_delimiters(text: str, media_type: str) -> None:
+    """Test the delimiter is taken from the media type or the header line."""
+    selector = compile_cell_selector("name=x/value")
+    assert Table(text, media_type).cell(selector) == "1,5"
+
+
+def test_header_only_and_empty() -> None:
+    """Test documents without data rows select nothing."""
+    selector = compile_cell_selector("0/a")
+    assert Table("a,b").cell(selector) is None
+    assert Table("").cell(selector) is None
+    assert Table("").columns == {}
+
+
+def test_duplicate_columns_use_first() -> None:
+    """Test a repeated column name addresses its first occurrence."""
+    table = Table("a,b,a\n1,2,3\n")
+    assert table.cell(compile_cell_selector("0/a")) == "1"
+
+
+@pytest.mark.parametrize(
+    "selector", ["cpu", "$.cpu", "a/b/c", "=x/cpu", "host=x/", "1.5/cpu"]
+)
+def test_not_cell_selectors(selector: str) -> None:
+    """Test selectors of other kinds are not taken for cell selectors."""
+    assert compile_cell_selector(selector) is None